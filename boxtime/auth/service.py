@@ -39,12 +39,22 @@ def refresh_credentials(creds: Credentials | None, scope: Scope) -> Credentials:
 
     with open(token_path, "w") as token:
         token.write(creds.to_json())
+    return creds
 
 
-def get_calendar_client(scope: Scope) -> Resource:
+def get_credentials(scope: Scope) -> Credentials:
     creds = get_local_credentials(scope)
 
     if not creds or not creds.valid:
-        refresh_credentials(creds, scope)
+        creds = refresh_credentials(creds, scope)
+    return creds
+
+
+def build_calendar_client(creds: Credentials) -> Resource:
+    # Use the discovery document shipped with google-api-python-client instead of fetching
+    # it over the network.
+    return build("calendar", "v3", credentials=creds, static_discovery=True)
 
-    return build("calendar", "v3", credentials=creds)
+
+def get_calendar_client(scope: Scope) -> Resource:
+    return build_calendar_client(get_credentials(scope))
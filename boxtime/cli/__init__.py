@@ -1,10 +1,86 @@
-from boxtime.cli.screens.main import BoxTime
-from boxtime.db.schema import People, TaskType, EmotionLog
+import argparse
+from pathlib import Path
+from typing import List
 
+from boxtime.utils.logger import LOG_PATH
 
-def main():
-    People.create_table()
-    TaskType.create_table()
-    EmotionLog.create_table()
+
+def run_app(args: argparse.Namespace) -> None:
+    from boxtime.cli.screens.main import BoxTime
+    from boxtime.db.migrations import migrate
+
+    migrate()
     app = BoxTime()
     app.run()
+
+
+def run_profile(args: argparse.Namespace) -> None:
+    from boxtime.utils.profile import report
+
+    print(report(args.log, last=args.last, limit=args.limit))
+
+
+def run_export(args: argparse.Namespace) -> None:
+    from boxtime.snapshot import compressed_path, export
+
+    manifest = export(args.path, events_dir=args.events_dir, compress=args.compress)
+    path = compressed_path(args.path) if args.compress else args.path
+    rows = ", ".join(f"{table}: {n}" for table, n in manifest["rows"].items())
+    print(f"Exported {rows} and {len(manifest['files'])} cache files to {path}")
+
+
+def run_import(args: argparse.Namespace) -> None:
+    from boxtime.snapshot import import_
+
+    imported = import_(args.path, events_dir=args.events_dir, replace=args.replace)
+    print("Imported " + ", ".join(f"{table}: {n}" for table, n in imported.items()))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="boxtime", description="Journal emotions and analyze time boxed events."
+    )
+    parser.set_defaults(run=run_app)
+    commands = parser.add_subparsers(title="commands")
+
+    app = commands.add_parser("app", help="Open the journal, the default.")
+    app.set_defaults(run=run_app)
+
+    profile = commands.add_parser(
+        "profile",
+        help="Summarize timings recorded with BOXTIME_PROFILE=1.",
+        description="p50/p95 durations per operation and counter totals, from the "
+        "spans in the debug log.",
+    )
+    profile.add_argument("--log", type=Path, default=LOG_PATH)
+    profile.add_argument(
+        "--last", action="store_true", help="Only the last profiled run."
+    )
+    profile.add_argument("--limit", type=int, default=None, help="Slowest operations.")
+    profile.set_defaults(run=run_profile)
+
+    export = commands.add_parser(
+        "export",
+        help="Write the database and event cache to a columnar snapshot.",
+        description="One memory-mappable .npy file per column in the directory PATH, or "
+        "a single compressed .npz file with --compress.",
+    )
+    export.add_argument("path", type=Path)
+    export.add_argument("--compress", action="store_true")
+    export.add_argument("--events-dir", type=Path, default=Path("assets", "events"))
+    export.set_defaults(run=run_export)
+
+    import_ = commands.add_parser(
+        "import", help="Load a snapshot into the database and event cache."
+    )
+    import_.add_argument("path", type=Path)
+    import_.add_argument(
+        "--replace",
+        action="store_true",
+        help="Replace existing rows and cache files instead of refusing.",
+    )
+    import_.add_argument("--events-dir", type=Path, default=Path("assets", "events"))
+    import_.set_defaults(run=run_import)
+
+    args = parser.parse_args(argv)
+    args.run(args)
@@ -10,7 +10,8 @@ from textual.widgets import Button, Label, Input, SelectionList, TextArea
 from textual.widgets.selection_list import Selection
 from textual.validation import Number
 
-from boxtime.db.schema import EmotionLog, Feeling, People, TaskType
+from boxtime.db.repository import repository
+from boxtime.db.schema import EmotionLog, Feeling
 from boxtime.utils.logger import logger
 
 
@@ -39,16 +40,6 @@ class LogScreen(ModalScreen[Optional[EmotionLog]]):
                 Selection(feeling.name.capitalize(), value=feeling.value)
             )
 
-        people_selections = []
-        for person in People.search():
-            people_selections.append(
-                Selection(person.username.capitalize(), value=person.id)
-            )
-
-        task_selections = []
-        for task in TaskType.search():
-            task_selections.append(Selection(task.name.capitalize(), value=task.id))
-
         with VerticalScroll(classes="log-screen-modal"):
             with Container(id="feeling"):
                 yield Label("How do you feel?")
@@ -89,11 +80,11 @@ class LogScreen(ModalScreen[Optional[EmotionLog]]):
 
             with Container(id="people"):
                 yield Label("Who were you with?")
-                yield SelectionList[int](*people_selections, id="people_list")
+                yield SelectionList[int](id="people_list")
 
             with Container(id="task"):
                 yield Label("What were you doing?")
-                yield SelectionList[int](*task_selections, id="task_list")
+                yield SelectionList[int](id="task_list")
 
             with Container(id="trigger"):
                 yield Label("What triggered it?")
@@ -109,10 +100,19 @@ class LogScreen(ModalScreen[Optional[EmotionLog]]):
                 )
                 yield Button("Back", id="quit", classes="half-width")
 
-    def on_mount(self) -> None:
-        pass
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_mount(self) -> None:
+        # The modal is drawn right away, people and tasks are filled in once loaded.
+        people = await repository.search_people()
+        self.query_one("#people_list").add_options(
+            Selection(person.username.capitalize(), value=person.id)
+            for person in people
+        )
+        tasks = await repository.search_tasks()
+        self.query_one("#task_list").add_options(
+            Selection(task.name.capitalize(), value=task.id) for task in tasks
+        )
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         match event.button.id:
             case "submit":
                 feeling = self.query_one("#feeling-list").selected[0]
@@ -126,7 +126,7 @@ class LogScreen(ModalScreen[Optional[EmotionLog]]):
                 timestamp = datetime.now().replace(
                     hour=hours, minute=minutes, second=0, microsecond=0
                 )
-                log = EmotionLog.insert(
+                log = await repository.insert_log(
                     feeling=feeling,
                     timestamp=timestamp,
                     duration=duration,
@@ -10,6 +10,7 @@ from textual.widgets import (
     Input,
 )
 
+from boxtime.db.repository import repository
 from boxtime.db.schema import People
 
 
@@ -32,12 +33,12 @@ class PeopleScreen(ModalScreen[Optional[People]]):
                 yield Button("Submit", id="submit", variant="primary", classes="button")
                 yield Button("Back", id="quit", classes="button")
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "submit":
             username = self.query_one("#username").value
             team = self.query_one("#team").value
             role = self.query_one("#role").value
-            person = People.insert(username, team, role)
+            person = await repository.insert_person(username, team, role)
             self.dismiss(person)
         else:
             self.dismiss(None)
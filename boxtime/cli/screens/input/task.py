@@ -7,6 +7,7 @@ from textual.message import Message
 from textual.widgets import Button, Label, Input, SelectionList
 from textual.widgets.selection_list import Selection
 
+from boxtime.db.repository import repository
 from boxtime.db.schema import TaskType, Skill
 from boxtime.utils.logger import logger
 
@@ -35,13 +36,14 @@ class TaskScreen(ModalScreen[Optional[TaskType]]):
                 yield Button("Submit", id="submit", variant="primary", classes="button")
                 yield Button("Back", id="quit", classes="button")
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "submit":
             name = self.query_one("#task_name").value
             skills = self.query_one("#skill_option").selected
+            skill = Skill(skills[0]) if skills else Skill.NONE
             experience = self.query_one("#experience").value
             logger.debug(f"Inserting task: {name}, {skill}, {experience}")
-            task = TaskType.insert(name, skill, experience)
+            task = await repository.insert_task(name, skill, experience)
             self.dismiss(task)
         else:
             self.dismiss(None)
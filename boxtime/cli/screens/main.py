@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Optional, List, Sequence
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -7,7 +7,6 @@ from textual.reactive import reactive
 from textual.widgets import (
     Footer,
     Header,
-    DataTable,
     Static,
 )
 
@@ -16,6 +15,43 @@ from boxtime.cli.art import LOGO
 from boxtime.cli.screens.input.people import PeopleScreen
 from boxtime.cli.screens.input.task import TaskScreen
 from boxtime.cli.screens.input.log import LogScreen
+from boxtime.cli.screens.search import SearchScreen
+from boxtime.cli.widgets.paged_table import PagedTable, Row
+
+
+PEOPLE_COLUMNS = ("ID", "Username", "Team", "Role")
+TASK_COLUMNS = ("ID", "Task", "Skill", "Experience")
+LOG_COLUMNS = ("ID", "Emotion", "Timestamp", "People", "Task")
+
+
+def person_cells(person: People) -> Sequence[Any]:
+    return [person.id, person.username, person.team, person.role]
+
+
+def task_cells(task: TaskType) -> Sequence[Any]:
+    return [task.id, task.name, task.skill, task.experience]
+
+
+def log_cells(log: EmotionLog) -> Sequence[Any]:
+    return [
+        log.id,
+        log.feeling,
+        log.timestamp,
+        [person.username for person in log.people],
+        [task.name for task in log.task],
+    ]
+
+
+def people_page(after: int | None, limit: int) -> List[Row]:
+    return [(person.id, person_cells(person)) for person in People.page(after, limit)]
+
+
+def task_page(after: int | None, limit: int) -> List[Row]:
+    return [(task.id, task_cells(task)) for task in TaskType.page(after, limit)]
+
+
+def log_page(after: int | None, limit: int) -> List[Row]:
+    return [(log.id, log_cells(log)) for log in EmotionLog.page(after, limit)]
 
 
 class BoxTime(App):
@@ -27,6 +63,7 @@ class BoxTime(App):
         Binding(key="t", action="add_task", description="Add a task category"),
         Binding(key="p", action="add_people", description="Add a person"),
         Binding(key="l", action="add_log", description="Log a new emotion"),
+        Binding(key="/", action="search", description="Search logs"),
     ]
 
     rows: List[People] = reactive([], layout=True)
@@ -34,10 +71,12 @@ class BoxTime(App):
     def compose(self) -> ComposeResult:
         yield Header(name="BoxTime", show_clock=True)
         with Grid(classes="main"):
-            yield DataTable(id="people_list")
-            yield DataTable(id="emotion_logs", classes="primary")
+            yield PagedTable(people_page, PEOPLE_COLUMNS, id="people_list")
+            yield PagedTable(
+                log_page, LOG_COLUMNS, id="emotion_logs", classes="primary"
+            )
             yield Static("")
-            yield DataTable(id="task_list")
+            yield PagedTable(task_page, TASK_COLUMNS, id="task_list")
             yield Static("")
             yield Static("")
             yield Static("")
@@ -48,65 +87,38 @@ class BoxTime(App):
             yield Static("")
         yield Footer()
 
-    def on_mount(self) -> None:
-        people_list: DataTable = self.query_one("#people_list")
-        people_list.add_columns("ID", "Username", "Team", "Role")
-
-        task_list: DataTable = self.query_one("#task_list")
-        task_list.add_columns("ID", "Task", "Skill", "Experience")
-
-        emotion_logs: DataTable = self.query_one("#emotion_logs")
-        emotion_logs.add_columns(
-            "ID",
-            "Emotion",
-            "Timestamp",
-            "People",
-            "Task",
-        )
-
-        for person in People.search():
-            people_list.add_row(*[person.id, person.username, person.team, person.role])
-
-        for task in TaskType.search():
-            task_list.add_row(*[task.id, task.name, task.skill, task.experience])
-
-        for log in EmotionLog.search():
-            emotion_logs.add_row(
-                *[
-                    log.id,
-                    log.feeling,
-                    log.timestamp,
-                    [person.username for person in log.people],
-                    [task.name for task in log.task],
-                ]
-            )
-
     def action_add_people(self) -> None:
         def check_people(person: Optional[People]) -> None:
-            people_list = self.query_one("#people_list")
+            people_list: PagedTable = self.query_one("#people_list")
 
             if person:
-                people_list.add_row(
-                    *[person.id, person.username, person.team, person.role]
-                )
+                people_list.append(person.id, person_cells(person))
 
         self.push_screen(PeopleScreen(), check_people)
 
     def action_add_task(self) -> None:
         def check_task(task: Optional[TaskType]) -> None:
-            task_list = self.query_one("#task_list")
+            task_list: PagedTable = self.query_one("#task_list")
 
             if task:
-                task_list.add_row(*[task.id, task.name, task.skill, task.experience])
+                task_list.append(task.id, task_cells(task))
 
         self.push_screen(TaskScreen(), check_task)
 
     def action_add_log(self) -> None:
         def check_log(log: Optional[EmotionLog]) -> None:
-            emotion_logs = self.query_one("#emotion_logs")
+            emotion_logs: PagedTable = self.query_one("#emotion_logs")
             if log:
-                emotion_logs.add_row(
-                    *[log.id, log.feeling, log.timestamp, log.people, log.task]
-                )
+                emotion_logs.append(log.id, log_cells(log))
 
         self.push_screen(LogScreen(), check_log)
+
+    def action_search(self) -> None:
+        def show_log(log: Optional[EmotionLog]) -> None:
+            emotion_logs: PagedTable = self.query_one("#emotion_logs")
+            # Only loaded rows can be shown, pages load while scrolling towards a row.
+            if log and str(log.id) in emotion_logs.rows:
+                emotion_logs.move_cursor(row=emotion_logs.get_row_index(str(log.id)))
+                emotion_logs.focus()
+
+        self.push_screen(SearchScreen(), show_log)
@@ -0,0 +1,90 @@
+import re
+from typing import Dict, Optional
+
+from rich.text import Text
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Input, Label
+
+from boxtime.db.repository import repository
+from boxtime.db.schema import EmotionLog
+
+# Control characters can't be typed into a log, so they're safe to mark matches with.
+HIGHLIGHT = ("\x02", "\x03")
+MATCHED = re.compile(f"{HIGHLIGHT[0]}(.*?){HIGHLIGHT[1]}")
+MATCH_COLUMNS = ("ID", "Emotion", "Timestamp", "Match")
+
+
+def highlighted(snippet: str) -> Text:
+    text = Text()
+    position = 0
+    for match in MATCHED.finditer(snippet):
+        text.append(snippet[position : match.start()])
+        text.append(match.group(1), style="bold reverse")
+        position = match.end()
+    text.append(snippet[position:])
+    return text
+
+
+class SearchScreen(ModalScreen[Optional[EmotionLog]]):
+    """
+    Full-text search over the trigger and reaction of emotion logs, results follow typing.
+
+    Selecting a match dismisses the screen with its log.
+    """
+
+    CSS_PATH = "./../css/search_screen.tcss"
+    BINDINGS = [Binding(key="escape", action="back", description="Back")]
+
+    def __init__(self, limit: int = 50, **kwargs):
+        super().__init__(**kwargs)
+        self.limit = limit
+        self.logs: Dict[str, EmotionLog] = {}
+
+    def compose(self) -> ComposeResult:
+        with Vertical(classes="search-screen-modal"):
+            yield Label("Search triggers and reactions:")
+            yield Input(placeholder="deadline", id="query")
+            yield DataTable(id="matches", cursor_type="row")
+            yield Button("Back", id="quit")
+
+    def on_mount(self) -> None:
+        self.query_one("#matches").add_columns(*MATCH_COLUMNS)
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.search(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.query_one("#matches").focus()
+
+    @work(exclusive=True, group="search")
+    async def search(self, text: str) -> None:
+        # Exclusive, a newer keystroke cancels a search that's still running.
+        matches = await repository.search_text(
+            text, limit=self.limit, highlight=HIGHLIGHT
+        )
+        table: DataTable = self.query_one("#matches")
+        table.clear()
+        self.logs = {}
+        for match in matches:
+            key = str(match.log.id)
+            self.logs[key] = match.log
+            table.add_row(
+                match.log.id,
+                match.log.feeling,
+                match.log.timestamp,
+                highlighted(match.snippet),
+                key=key,
+            )
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        self.dismiss(self.logs.get(event.row_key.value))
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        self.dismiss(None)
+
+    def action_back(self) -> None:
+        self.dismiss(None)
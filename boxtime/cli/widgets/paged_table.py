@@ -0,0 +1,90 @@
+from typing import Any, Callable, List, Sequence, Tuple
+
+from textual import work
+from textual.widgets import DataTable
+
+from boxtime.db.repository import repository
+
+Row = Tuple[int, Sequence[Any]]
+PageFetcher = Callable[[int | None, int], List[Row]]
+
+
+class PagedTable(DataTable):
+    """
+    A `DataTable` that loads its rows a page at a time.
+
+    `fetch(after, limit)` returns up to `limit` `(key, cells)` rows following the key
+    `after`, in key order. It runs on the database thread of `repository`, so queries never
+    block drawing. The first page is requested on mount, and the next one whenever the table
+    isn't filled or the view gets within a page of the last loaded row.
+    """
+
+    def __init__(
+        self,
+        fetch: PageFetcher,
+        columns: Sequence[str],
+        page_size: int = 100,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.fetch = fetch
+        self.column_labels = columns
+        self.page_size = page_size
+        self.after: int | None = None
+        self._fetching = False
+        self.exhausted = False
+
+    def on_mount(self) -> None:
+        self.add_columns(*self.column_labels)
+        self.load_more()
+
+    def load_more(self) -> None:
+        if self._fetching or self.exhausted:
+            return
+        self._fetching = True
+        self.fetch_page(self.after)
+
+    @work(group="pages", exit_on_error=False)
+    async def fetch_page(self, after: int | None) -> None:
+        # A failed page is asked for again the next time the view moves.
+        try:
+            rows = await repository.run(self.fetch, after, self.page_size)
+        finally:
+            self._fetching = False
+        self.add_page(rows)
+
+    def add_page(self, rows: List[Row]) -> None:
+        for key, cells in rows:
+            self.add_keyed_row(key, cells)
+        if rows:
+            self.after = rows[-1][0]
+        self.exhausted = len(rows) < self.page_size
+        self.call_after_refresh(self.check_remaining)
+
+    def add_keyed_row(self, key: int, cells: Sequence[Any]) -> None:
+        if str(key) not in self.rows:
+            self.add_row(*cells, key=str(key))
+
+    def append(self, key: int, cells: Sequence[Any]) -> None:
+        """
+        Show a row created after the table was loaded.
+
+        Rows are kept in key order: until the last page is loaded, a new row (which has the
+        largest key) arrives with it instead.
+        """
+        if self.exhausted:
+            self.add_keyed_row(key, cells)
+
+    def check_remaining(self) -> None:
+        remaining = self.row_count - (self.scroll_y + self.size.height)
+        if remaining < self.page_size:
+            self.load_more()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.check_remaining()
+
+    def watch_cursor_coordinate(self, old_coordinate, new_coordinate) -> None:
+        super().watch_cursor_coordinate(old_coordinate, new_coordinate)
+        if self.row_count - new_coordinate.row < self.page_size:
+            self.load_more()
@@ -0,0 +1,82 @@
+from typing import Any, Dict, Tuple
+from enum import Enum
+
+import numpy as np
+
+from boxtime.vendor.colors import N_COLORS, Color, tag_names
+
+
+class AggregateBy(Enum):
+    HOUR = "hour"
+    DAY = "day"
+    DAY_OF_WEEK = "day_of_week"
+    WEEK = "week"
+    MONTH = "month"
+    TAG = "tag"
+    FEELING = "feeling"
+    ATTENDEE = "attendee"
+
+
+AXIS_SIZE = {
+    AggregateBy.HOUR: 24,
+    AggregateBy.DAY: 31,
+    AggregateBy.DAY_OF_WEEK: 7,
+    AggregateBy.WEEK: 53,
+    AggregateBy.MONTH: 12,
+    AggregateBy.TAG: N_COLORS,
+    # Members of `boxtime.db.schema.Feeling`, emotion logs only.
+    AggregateBy.FEELING: 5,
+}
+# `ATTENDEE` has no fixed size, its axis has one label per attendee seen.
+
+
+def axis_labels(tags: Dict[Color, str], field: AggregateBy) -> np.ndarray:
+    if field == AggregateBy.TAG:
+        return tag_names(tags)
+    return np.arange(AXIS_SIZE[field])
+
+
+class Aggregation:
+    """
+    Event durations (hours) reduced into a dense array with one axis per field.
+
+    `values[i, j]` is the total duration of events in bucket `labels[0][i]` of `fields[0]` and
+    `labels[1][j]` of `fields[1]`. `counts` has the number of events per cell, to tell empty
+    buckets from zero-length events.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        counts: np.ndarray,
+        fields: Tuple[AggregateBy, ...],
+        labels: Tuple[np.ndarray, ...],
+    ):
+        self.values = values
+        self.counts = counts
+        self.fields = fields
+        self.labels = labels
+
+    def present(self, axis: int) -> np.ndarray:
+        """
+        Mask of the labels along `axis` that have at least one event.
+        """
+        other = tuple(i for i in range(self.counts.ndim) if i != axis)
+        return self.counts.sum(axis=other) > 0
+
+    def to_dict(self) -> Dict[Any, Any]:
+        """
+        Nested dict of non-empty cells, the shape `agg_by` used to return.
+        """
+        result: Dict[Any, Any] = {}
+        for index in zip(*np.nonzero(self.counts)):
+            keys = [labels[i] for labels, i in zip(self.labels, index)]
+            node = result
+            for key in keys[:-1]:
+                node = node.setdefault(key, {})
+            node[keys[-1]] = float(self.values[index])
+        return result
+
+    def __repr__(self) -> str:
+        fields = ", ".join(field.value for field in self.fields)
+        return f"Aggregation(fields=({fields}), shape={self.values.shape})"
@@ -0,0 +1,85 @@
+import threading
+from typing import Callable, Dict, Generic, List, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from boxtime.db.connection import SQLConnect
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class TableCache(Generic[T]):
+    """
+    In-memory copy of a small table, by id and by a unique `key` field.
+
+    Every thread keeps its own copy, read on its own connection, with the stamp it was read
+    under: `PRAGMA data_version`, which changes for a connection whenever any other
+    connection commits to the database, and the `generation` of the connection manager,
+    which counts the commits in this process that changed rows. Between them every committed
+    write is noticed, by the models or raw SQL, on this connection or another, in this
+    process or another. A copy is only ever served to the thread that read it, so rows one
+    thread read before a commit never stand in for what another read after it.
+
+    Inside a transaction the copy is used while it is current. Once the transaction has
+    changed rows the table is read directly, and nothing read that way is cached, so rows
+    of a transaction that later rolls back never reach the cache.
+    """
+
+    def __init__(self, load: Callable[[], List[T]], key: str):
+        self.load = load
+        self.key = key
+        self._local = threading.local()
+        # Bumped by `invalidate`, drops the copies of every thread.
+        self.epoch = 0
+
+    @staticmethod
+    def stamp() -> Tuple[int, int]:
+        manager = SQLConnect.manager
+        generation = manager.generation
+        version = manager.connection.execute("PRAGMA data_version").fetchone()[0]
+        return version, generation
+
+    def index(self, rows: List[T]) -> Tuple[Dict[int, T], Dict[str, T]]:
+        return (
+            {row.id: row for row in rows},
+            {getattr(row, self.key): row for row in rows},
+        )
+
+    def snapshot(self) -> Tuple[Dict[int, T], Dict[str, T]]:
+        """
+        The rows by id and by key, reloaded first when they may be stale.
+        """
+        manager = SQLConnect.manager
+        if manager.dirty:
+            return self.index(self.load())
+        # Managers compare by identity, a reconfigured database never matches an old copy.
+        stamp = (manager, self.epoch, *self.stamp())
+        copy = getattr(self._local, "copy", None)
+        if copy is not None and copy[0] == stamp:
+            return copy[1], copy[2]
+        by_id, by_key = self.index(self.load())
+        if manager.depth:
+            # The transaction may read data older than what was committed since it began.
+            return by_id, by_key
+        self._local.copy = (stamp, by_id, by_key)
+        return by_id, by_key
+
+    def all(self) -> List[T]:
+        by_id, _ = self.snapshot()
+        return [row.model_copy() for row in by_id.values()]
+
+    def get(self, id_: int) -> T | None:
+        by_id, _ = self.snapshot()
+        row = by_id.get(id_)
+        return row.model_copy() if row is not None else None
+
+    def find(self, key: str) -> T | None:
+        _, by_key = self.snapshot()
+        row = by_key.get(key)
+        return row.model_copy() if row is not None else None
+
+    def invalidate(self) -> None:
+        """
+        Drop the copies. Not needed after writes, which are noticed on their own.
+        """
+        self.epoch += 1
@@ -0,0 +1,222 @@
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from boxtime.utils import profile
+
+
+def default_db_path() -> Path:
+    return Path.home() / ".boxtime" / "boxtime.db"
+
+
+class ConnectionManager:
+    """
+    Process-wide owner of sqlite connections.
+
+    Each thread gets one long-lived connection to the database, opened lazily on first use.
+    Connections run in WAL mode with a busy timeout so that a reader never blocks a writer and
+    concurrent writers wait for the lock instead of failing with "database is locked".
+    Transactions are managed explicitly (the connection is in autocommit mode) which lets
+    `SQLConnect` blocks nest inside an outer transaction.
+    """
+
+    def __init__(self, path: Path | None = None, busy_timeout_ms: int = 5000):
+        self.path = Path(path) if path else default_db_path()
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._ready = False
+        # Bumped by every committed transaction that changed rows, through any connection.
+        self.generation = 0
+
+    def _prepare(self) -> None:
+        with self._lock:
+            if self._ready:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._ready = True
+
+    def _open(self) -> sqlite3.Connection:
+        self._prepare()
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._lock:
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The calling thread's connection, opened on first access.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @property
+    def depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the calling thread's open transaction has changed any rows.
+        """
+        return self.depth > 0 and self.connection.total_changes != self._local.changes
+
+    def begin(self, immediate: bool = False) -> sqlite3.Connection:
+        """
+        Enter a transaction on the calling thread's connection.
+
+        Only the outermost call issues BEGIN, nested calls join the open transaction.
+        """
+        conn = self.connection
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            self._local.changes = conn.total_changes
+        self._local.depth += 1
+        return conn
+
+    def end(self, commit: bool) -> None:
+        """
+        Leave a transaction entered with `begin`.
+
+        The outermost call commits or rolls back. A failure in a nested block rolls back the
+        whole transaction once the outermost block exits, since the exception propagates.
+        A commit that fails, on a busy database or a deferred constraint, is rolled back so the
+        connection is never left inside a transaction.
+        """
+        conn = self.connection
+        if self._local.depth > 1:
+            self._local.depth -= 1
+            return
+        try:
+            if commit:
+                conn.commit()
+                if conn.total_changes != self._local.changes:
+                    with self._lock:
+                        self.generation += 1
+            else:
+                conn.rollback()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth = 0
+
+    def close(self) -> None:
+        """
+        Close the calling thread's connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+        self._local.conn = None
+        self._local.depth = 0
+
+    def close_all(self) -> None:
+        """
+        Close every connection opened by this manager, from any thread.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def statement(sql: str) -> str:
+    return " ".join(sql.split())[:60]
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    A cursor timing every statement it runs, handed out while profiling.
+    """
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TimedCursor":
+        with profile.span("db.query", statement(sql)):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Iterable[Any]) -> "TimedCursor":
+        with profile.span("db.query", statement(sql)):
+            return super().executemany(sql, parameters)
+
+
+class SQLConnect:
+    """
+    Transaction scope over the shared, per-thread connection.
+
+    ```python
+    with SQLConnect() as cursor:
+        cursor.execute(...)
+    ```
+
+    Blocks nest: an inner `SQLConnect` joins the outer transaction, so several model calls can
+    be grouped atomically with `SQLConnect.transaction()`.
+    """
+
+    manager: ConnectionManager = ConnectionManager()
+
+    def __init__(self, readonly: bool = False):
+        self.readonly = readonly
+        self.conn: sqlite3.Connection | None = None
+        self.cursor: sqlite3.Cursor | None = None
+        self.span = profile.span("db.session", readonly=readonly)
+
+    @classmethod
+    def configure(cls, path: Path | None = None, busy_timeout_ms: int = 5000) -> None:
+        """
+        Point every subsequent `SQLConnect` at a different database file.
+        """
+        cls.manager.close_all()
+        cls.manager = ConnectionManager(path, busy_timeout_ms=busy_timeout_ms)
+
+    @classmethod
+    def transaction(cls) -> "SQLConnect":
+        """
+        An explicit write transaction spanning multiple statements or model calls.
+        """
+        return cls(readonly=False)
+
+    def connect(self) -> None:
+        self.conn = self.manager.begin(immediate=not self.readonly)
+        if profile.ENABLED:
+            self.cursor = self.conn.cursor(TimedCursor)
+        else:
+            self.cursor = self.conn.cursor()
+
+    def __enter__(self) -> sqlite3.Cursor:
+        self.span.__enter__()
+        self.connect()
+        return self.cursor
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.cursor.close()
+            self.manager.end(commit=exc_type is None)
+        finally:
+            self.span.__exit__(exc_type, exc_val, exc_tb)
+
+
+atexit.register(lambda: SQLConnect.manager.close_all())
@@ -0,0 +1,323 @@
+"""
+Versioned schema migrations.
+
+The schema version lives in sqlite's `PRAGMA user_version`. Each entry of `MIGRATIONS` moves
+the database one version forward and is never edited once released; schema changes are made
+by appending a new migration.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Callable, List
+
+from boxtime.db.connection import SQLConnect
+from boxtime.utils.epoch import to_epoch
+from boxtime.utils.logger import logger
+
+Migration = Callable[[sqlite3.Cursor], None]
+
+
+def create_tables(cursor: sqlite3.Cursor) -> None:
+    """
+    v1: The original tables. `IF NOT EXISTS` adopts databases created before versioning.
+    """
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS people (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            team TEXT NOT NULL,
+            role TEXT NOT NULL,
+            is_self INTEGER NOT NULL DEFAULT 0
+        )"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS task_type (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            skill INTEGER NOT NULL,
+            experience REAL NOT NULL
+        )"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS emotion_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feeling INTEGER NOT NULL,
+            timestamp TEXT NOT NULL,
+            duration INTEGER NOT NULL,
+            trigger TEXT NOT NULL,
+            reaction TEXT NOT NULL,
+            people_id TEXT,
+            task_id TEXT,
+            resolved INTEGER NOT NULL DEFAULT 0
+        )"""
+    )
+
+
+def _parse_ids(ids: str | None) -> List[int]:
+    if not ids:
+        return []
+    try:
+        parsed = json.loads(ids)
+    except json.JSONDecodeError:
+        return []
+    return [int(id_) for id_ in parsed] if isinstance(parsed, list) else []
+
+
+def link_tables(cursor: sqlite3.Cursor) -> None:
+    """
+    v2: People and tasks of a log move from `str(list)` columns into junction tables.
+
+    Ids that no longer exist are dropped. Migrated rows have the legacy columns cleared.
+    """
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS emotion_log_people (
+            emotion_log_id INTEGER NOT NULL REFERENCES emotion_log (id) ON DELETE CASCADE,
+            people_id INTEGER NOT NULL REFERENCES people (id) ON DELETE CASCADE,
+            PRIMARY KEY (emotion_log_id, people_id)
+        ) WITHOUT ROWID"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS emotion_log_task (
+            emotion_log_id INTEGER NOT NULL REFERENCES emotion_log (id) ON DELETE CASCADE,
+            task_id INTEGER NOT NULL REFERENCES task_type (id) ON DELETE CASCADE,
+            PRIMARY KEY (emotion_log_id, task_id)
+        ) WITHOUT ROWID"""
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS emotion_log_people_people_id"
+        " ON emotion_log_people (people_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS emotion_log_task_task_id"
+        " ON emotion_log_task (task_id)"
+    )
+
+    cursor.execute(
+        "SELECT id, people_id, task_id FROM emotion_log"
+        " WHERE people_id IS NOT NULL OR task_id IS NOT NULL"
+    )
+    people_links, task_links = [], []
+    for row in cursor.fetchall():
+        people_links += [(row["id"], id_) for id_ in _parse_ids(row["people_id"])]
+        task_links += [(row["id"], id_) for id_ in _parse_ids(row["task_id"])]
+    cursor.executemany(
+        "INSERT OR IGNORE INTO emotion_log_people (emotion_log_id, people_id)"
+        " SELECT ?, id FROM people WHERE id = ?",
+        people_links,
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO emotion_log_task (emotion_log_id, task_id)"
+        " SELECT ?, id FROM task_type WHERE id = ?",
+        task_links,
+    )
+    cursor.execute(
+        "UPDATE emotion_log SET people_id = NULL, task_id = NULL"
+        " WHERE people_id IS NOT NULL OR task_id IS NOT NULL"
+    )
+
+
+def epoch_timestamps(cursor: sqlite3.Cursor) -> None:
+    """
+    v3: `emotion_log.timestamp` becomes integer epoch seconds, the legacy id columns are
+    dropped and the filtered columns get indexes.
+
+    sqlite can't change a column type in place, so the table is rebuilt and renamed.
+    """
+    cursor.execute(
+        """CREATE TABLE emotion_log_v3 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feeling INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            trigger TEXT NOT NULL,
+            reaction TEXT NOT NULL,
+            resolved INTEGER NOT NULL DEFAULT 0
+        )"""
+    )
+    cursor.execute(
+        "SELECT id, feeling, timestamp, duration, trigger, reaction, resolved"
+        " FROM emotion_log"
+    )
+    rows = [
+        (
+            row["id"],
+            row["feeling"],
+            to_epoch(datetime.fromisoformat(row["timestamp"])),
+            row["duration"],
+            row["trigger"],
+            row["reaction"],
+            row["resolved"],
+        )
+        for row in cursor.fetchall()
+    ]
+    cursor.executemany(
+        "INSERT INTO emotion_log_v3 (id, feeling, timestamp, duration, trigger,"
+        " reaction, resolved) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    cursor.execute("DROP TABLE emotion_log")
+    cursor.execute("ALTER TABLE emotion_log_v3 RENAME TO emotion_log")
+    cursor.execute("CREATE INDEX emotion_log_timestamp ON emotion_log (timestamp)")
+    cursor.execute(
+        "CREATE INDEX emotion_log_feeling ON emotion_log (feeling, timestamp)"
+    )
+    cursor.execute(
+        "CREATE INDEX emotion_log_resolved ON emotion_log (resolved, timestamp)"
+    )
+
+
+def event_rollups(cursor: sqlite3.Cursor) -> None:
+    """
+    v4: Calendar event durations rolled up per calendar, day and color.
+
+    `calendar_event` keeps what each synced event contributes, the local day it starts on,
+    its color and duration in seconds. Triggers keep `event_rollup` equal to the sums over
+    `calendar_event`, so a changed event only touches the rollup rows of its old and new day.
+    """
+    cursor.execute(
+        """CREATE TABLE calendar_event (
+            calendar_id TEXT NOT NULL,
+            event_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            color INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            PRIMARY KEY (calendar_id, event_id)
+        ) WITHOUT ROWID"""
+    )
+    cursor.execute(
+        """CREATE TABLE event_rollup (
+            calendar_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            color INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            events INTEGER NOT NULL,
+            PRIMARY KEY (calendar_id, day, color)
+        ) WITHOUT ROWID"""
+    )
+    add = """INSERT INTO event_rollup (calendar_id, day, color, duration, events)
+            VALUES (new.calendar_id, new.day, new.color, new.duration, 1)
+            ON CONFLICT (calendar_id, day, color) DO UPDATE SET
+                duration = duration + excluded.duration,
+                events = events + 1;"""
+    remove = """UPDATE event_rollup
+            SET duration = duration - old.duration, events = events - 1
+            WHERE calendar_id = old.calendar_id AND day = old.day AND color = old.color;
+            DELETE FROM event_rollup
+            WHERE calendar_id = old.calendar_id AND day = old.day AND color = old.color
+                AND events = 0;"""
+    cursor.execute(
+        f"""CREATE TRIGGER calendar_event_insert AFTER INSERT ON calendar_event
+        BEGIN
+            {add}
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER calendar_event_delete AFTER DELETE ON calendar_event
+        BEGIN
+            {remove}
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER calendar_event_update
+        AFTER UPDATE OF day, color, duration ON calendar_event
+        BEGIN
+            {remove}
+            {add}
+        END"""
+    )
+
+
+def log_search(cursor: sqlite3.Cursor) -> None:
+    """
+    v5: A full-text index over the `trigger` and `reaction` of emotion logs.
+
+    `emotion_log_fts` is an external content FTS5 table, it stores only the index and reads
+    the text from `emotion_log`. Triggers keep the index in step with the table, existing
+    logs are indexed by a rebuild.
+    """
+    cursor.execute(
+        """CREATE VIRTUAL TABLE emotion_log_fts USING fts5 (
+            trigger,
+            reaction,
+            content = 'emotion_log',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )"""
+    )
+    add = """INSERT INTO emotion_log_fts (rowid, trigger, reaction)
+            VALUES (new.id, new.trigger, new.reaction);"""
+    remove = """INSERT INTO emotion_log_fts (emotion_log_fts, rowid, trigger, reaction)
+            VALUES ('delete', old.id, old.trigger, old.reaction);"""
+    cursor.execute(
+        f"""CREATE TRIGGER emotion_log_fts_insert AFTER INSERT ON emotion_log
+        BEGIN
+            {add}
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER emotion_log_fts_delete AFTER DELETE ON emotion_log
+        BEGIN
+            {remove}
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER emotion_log_fts_update
+        AFTER UPDATE OF trigger, reaction ON emotion_log
+        BEGIN
+            {remove}
+            {add}
+        END"""
+    )
+    cursor.execute("INSERT INTO emotion_log_fts (emotion_log_fts) VALUES ('rebuild')")
+
+
+MIGRATIONS: List[Migration] = [
+    create_tables,
+    link_tables,
+    epoch_timestamps,
+    event_rollups,
+    log_search,
+]
+
+
+def schema_version() -> int:
+    with SQLConnect(readonly=True) as cursor:
+        return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate() -> int:
+    """
+    Bring the database up to the latest schema version.
+
+    All pending migrations run in a single transaction with foreign key enforcement off, as
+    sqlite recommends for table rebuilds, and the result is checked for dangling references
+    before committing.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    latest = len(MIGRATIONS)
+    if schema_version() >= latest:
+        return latest
+
+    manager = SQLConnect.manager
+    if manager.depth:
+        raise RuntimeError("migrate() can't run inside an open transaction.")
+
+    conn = manager.connection
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        with SQLConnect.transaction() as cursor:
+            # Re-read under the write lock, another process may have migrated meanwhile.
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for migration in MIGRATIONS[version:]:
+                version += 1
+                logger.info(f"Migrating database to v{version}: {migration.__name__}")
+                migration(cursor)
+            if cursor.execute("PRAGMA foreign_key_check").fetchall():
+                raise sqlite3.IntegrityError("Migration left dangling foreign keys.")
+            cursor.execute(f"PRAGMA user_version = {version}")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return version
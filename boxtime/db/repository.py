@@ -0,0 +1,83 @@
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, List, Tuple, TypeVar
+
+from boxtime.db.schema import EmotionLog, Feeling, LogMatch, People, Skill, TaskType
+
+T = TypeVar("T")
+
+
+class Repository:
+    """
+    Awaitable access to the models for code running on an event loop, like the TUI.
+
+    Calls are queued to a single database thread and run there in order, so the loop keeps
+    drawing and handling keys while sqlite works, and writes never contend with each other
+    for the database lock.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="boxtime-db"
+        )
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run any model call, or several grouped in a function, on the database thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def search_people(
+        self, username: str | None = None, id: int | None = None
+    ) -> List[People]:
+        return await self.run(People.search, username=username, id=id)
+
+    async def insert_person(self, username: str, team: str, role: str) -> People:
+        return await self.run(People.insert, username, team, role)
+
+    async def search_tasks(
+        self, name: str | None = None, id: int | None = None
+    ) -> List[TaskType]:
+        return await self.run(TaskType.search, name=name, id=id)
+
+    async def insert_task(self, name: str, skill: Skill, experience: float) -> TaskType:
+        return await self.run(TaskType.insert, name, skill, experience)
+
+    async def insert_log(
+        self,
+        feeling: Feeling,
+        timestamp: datetime,
+        duration: int,
+        trigger: str,
+        reaction: str,
+        people_id: List[int],
+        task_id: List[int],
+    ) -> EmotionLog:
+        return await self.run(
+            EmotionLog.insert,
+            feeling=feeling,
+            timestamp=timestamp,
+            duration=duration,
+            trigger=trigger,
+            reaction=reaction,
+            people_id=people_id,
+            task_id=task_id,
+        )
+
+    async def search_text(
+        self, text: str, limit: int = 20, highlight: Tuple[str, str] = ("[", "]")
+    ) -> List[LogMatch]:
+        return await self.run(
+            EmotionLog.search_text, text, limit=limit, highlight=highlight
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+repository = Repository()
+atexit.register(repository.close)
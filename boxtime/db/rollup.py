@@ -0,0 +1,209 @@
+from datetime import date
+from itertools import repeat
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from boxtime.db.aggregation import AXIS_SIZE, AggregateBy, Aggregation, axis_labels
+from boxtime.db.connection import SQLConnect
+from boxtime.vendor.frame import (
+    EventFrame,
+    day_of_week_sql,
+    iso_week_sql,
+    local_days,
+)
+from boxtime.vendor.sync import RawEvent
+from boxtime.vendor.colors import Color
+
+EPOCH_DAY = date(1970, 1, 1)
+
+# Same buckets as `bucket_codes`, from days since the unix epoch.
+FIELD_SQL = {
+    AggregateBy.DAY: "CAST(strftime('%d', day * 86400, 'unixepoch') AS INTEGER) - 1",
+    AggregateBy.DAY_OF_WEEK: day_of_week_sql("day"),
+    AggregateBy.WEEK: iso_week_sql("day"),
+    AggregateBy.MONTH: "CAST(strftime('%m', day * 86400, 'unixepoch') AS INTEGER) - 1",
+    AggregateBy.TAG: "color",
+}
+
+SECONDS_IN_AN_HOUR = 3600.0
+
+
+def epoch_day(day: date) -> int:
+    return (day - EPOCH_DAY).days
+
+
+class EventRollup:
+    """
+    Event durations per calendar, local day and color, kept in sqlite.
+
+    `EventService.sync` feeds every change of a calendar into `apply`, and the triggers of the
+    v4 migration fold them into `event_rollup`. Chart inputs are then aggregate queries over
+    at most one row per day and color, instead of a pass over every event.
+    """
+
+    @staticmethod
+    def contributions(
+        calendar_id: str, items: Iterable[RawEvent]
+    ) -> List[Tuple[str, str, int, int, int]]:
+        """
+        `calendar_event` rows of raw events, bucketed like `agg_by` by their local start day.
+        """
+        frame = EventFrame.from_items(list(items), {})
+        return list(
+            zip(
+                repeat(calendar_id),
+                frame.id.tolist(),
+                local_days(frame).tolist(),
+                frame.color.tolist(),
+                (frame.end - frame.start).tolist(),
+            )
+        )
+
+    @classmethod
+    def tracks(cls, calendar_id: str) -> bool:
+        """
+        Whether any event of `calendar_id` has been rolled up.
+        """
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT 1 FROM calendar_event WHERE calendar_id = ? LIMIT 1",
+                (calendar_id,),
+            )
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def apply(
+        cls,
+        calendar_id: str,
+        upserted: Iterable[RawEvent],
+        deleted: Iterable[str],
+    ) -> None:
+        """
+        Roll up the events added, changed or removed since the last sync.
+        """
+        rows = cls.contributions(calendar_id, upserted)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "DELETE FROM calendar_event WHERE calendar_id = ? AND event_id = ?",
+                [(calendar_id, event_id) for event_id in deleted],
+            )
+            cursor.executemany(
+                "INSERT INTO calendar_event (calendar_id, event_id, day, color, duration)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (calendar_id, event_id) DO UPDATE SET"
+                " day = excluded.day, color = excluded.color, duration = excluded.duration"
+                " WHERE day != excluded.day OR color != excluded.color"
+                " OR duration != excluded.duration",
+                rows,
+            )
+
+    @classmethod
+    def rebuild(cls, calendar_id: str, items: Iterable[RawEvent]) -> None:
+        """
+        Replace the rollups of `calendar_id` with those of `items`, after a full sync.
+        """
+        rows = cls.contributions(calendar_id, items)
+        with SQLConnect() as cursor:
+            # Dropping the rollups first leaves the delete trigger nothing to update.
+            cursor.execute(
+                "DELETE FROM event_rollup WHERE calendar_id = ?", (calendar_id,)
+            )
+            cursor.execute(
+                "DELETE FROM calendar_event WHERE calendar_id = ?", (calendar_id,)
+            )
+            cursor.executemany(
+                "INSERT INTO calendar_event (calendar_id, event_id, day, color, duration)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    @staticmethod
+    def where(
+        calendar_id: str, start: date | None, end: date | None
+    ) -> Tuple[str, List[int | str]]:
+        conditions, params = ["calendar_id = ?"], [calendar_id]
+        if start is not None:
+            conditions.append("day >= ?")
+            params.append(epoch_day(start))
+        if end is not None:
+            conditions.append("day < ?")
+            params.append(epoch_day(end))
+        return "WHERE " + " AND ".join(conditions), params
+
+    @classmethod
+    def aggregate(
+        cls,
+        tags: Dict[Color, str],
+        *fields: AggregateBy,
+        calendar_id: str = "primary",
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Aggregation:
+        """
+        `agg_by` answered from the rollups of events starting on days in `[start, end)`.
+
+        Args:
+            tags (Dict[Color, str]): Tag names of colors, labels the `TAG` axis.
+            fields (AggregateBy): One axis of the result per field, in order.
+            calendar_id (str, optional): Calendar ID. Defaults to "primary".
+            start (date | None, optional): First day. Defaults to the first rolled up day.
+            end (date | None, optional): Day after the last. Defaults to no limit.
+
+        Returns:
+            Aggregation: Dense durations and event counts.
+        """
+        if not fields:
+            raise ValueError("Rollups are aggregated by at least one field.")
+        for field in fields:
+            if field not in FIELD_SQL:
+                raise ValueError(f"Rollups can't be aggregated by {field.value}.")
+        where, params = cls.where(calendar_id, start, end)
+        columns = ", ".join(FIELD_SQL[field] for field in fields)
+        groups = ", ".join(str(i + 1) for i in range(len(fields)))
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                f"SELECT {columns}, SUM(duration), SUM(events) FROM event_rollup"
+                f" {where} GROUP BY {groups}",
+                params,
+            )
+            rows = [tuple(row) for row in cursor.fetchall()]
+
+        rows = np.array(rows, dtype=np.int64).reshape(-1, len(fields) + 2)
+        shape = tuple(AXIS_SIZE[field] for field in fields)
+        values = np.zeros(shape)
+        counts = np.zeros(shape, dtype=np.int64)
+        index = tuple(rows[:, i] for i in range(len(fields)))
+        values[index] = rows[:, -2] / SECONDS_IN_AN_HOUR
+        counts[index] = rows[:, -1]
+        return Aggregation(
+            values=values,
+            counts=counts,
+            fields=fields,
+            labels=tuple(axis_labels(tags, field) for field in fields),
+        )
+
+    @classmethod
+    def daily_hours(
+        cls,
+        calendar_id: str = "primary",
+        start: date | None = None,
+        end: date | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hours of events per day, the input of `plot_daily_heatmap`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Days with events, as days since the unix epoch, and
+                their hours.
+        """
+        where, params = cls.where(calendar_id, start, end)
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                f"SELECT day, SUM(duration) FROM event_rollup {where}"
+                " GROUP BY day ORDER BY day",
+                params,
+            )
+            rows = [tuple(row) for row in cursor.fetchall()]
+        rows = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        return rows[:, 0], rows[:, 1] / SECONDS_IN_AN_HOUR
@@ -1,36 +1,28 @@
+import re
 import sqlite3
-import abc
+from collections import defaultdict
 from enum import Enum
-from typing import Dict, List, Optional
-from pathlib import Path
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from datetime import datetime
 
+import numpy as np
 from pydantic import Field, BaseModel
 
-
-class SQLConnect:
-    def __init__(self):
-        par = Path.home() / ".boxtime"
-        par.mkdir(parents=True, exist_ok=True)
-        self.path = par / "boxtime.db"
-        self.conn: sqlite3.Connection | None = None
-        self.cursor: sqlite3.Cursor | None = None
-
-    def connect(self) -> None:
-        self.conn = sqlite3.connect(self.path)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
-
-    def __enter__(self) -> sqlite3.Cursor:
-        self.connect()
-        return self.cursor
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            self.conn.rollback()
-        else:
-            self.conn.commit()
-        self.conn.close()
+from boxtime.db.aggregation import AXIS_SIZE, AggregateBy, Aggregation
+from boxtime.db.cache import TableCache
+from boxtime.db.connection import SQLConnect
+from boxtime.utils.epoch import from_epoch, to_epoch
+from boxtime.vendor.frame import day_of_week_sql, iso_week_sql
 
 
 class Feeling(Enum):
@@ -48,11 +40,81 @@ class Skill(Enum):
     NONE = 3
 
 
-class Table(BaseModel, abc.ABC):
-    @staticmethod
-    @abc.abstractmethod
-    def create_table(cls) -> str:
-        pass
+class Table(BaseModel):
+    @classmethod
+    def coerce_many(
+        cls, rows: Iterable[Union["Table", Dict[str, Any]]]
+    ) -> List["Table"]:
+        """
+        Validate a mix of models and dicts into a list of models.
+        """
+        return [row if isinstance(row, cls) else cls(**row) for row in rows]
+
+
+BULK_LOOKUP_CHUNK = 500
+
+# Buckets of a log's local start time, the `local` column of `EmotionLog.stats`, and of
+# its local day since the unix epoch.
+LOG_DAY_SQL = "(CAST(strftime('%s', local) AS INTEGER) / 86400)"
+LOG_FIELD_SQL = {
+    AggregateBy.HOUR: "CAST(strftime('%H', local) AS INTEGER)",
+    AggregateBy.DAY: "CAST(strftime('%d', local) AS INTEGER) - 1",
+    AggregateBy.DAY_OF_WEEK: day_of_week_sql(LOG_DAY_SQL),
+    AggregateBy.WEEK: iso_week_sql(LOG_DAY_SQL),
+    AggregateBy.MONTH: "CAST(strftime('%m', local) AS INTEGER) - 1",
+    AggregateBy.FEELING: "feeling",
+}
+
+MINUTES_IN_AN_HOUR = 60.0
+
+
+def inserted_ids(cursor: sqlite3.Cursor, n: int) -> List[int]:
+    """
+    Ids assigned by the `executemany` insert of `n` rows that just ran on `cursor`.
+
+    AUTOINCREMENT hands out consecutive ids while the insert holds the write lock, so the ids
+    are the `n` values ending at `last_insert_rowid()`.
+    """
+    if n == 0:
+        return []
+    last = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last - n + 1, last + 1))
+
+
+def ids_by_key(
+    cursor: sqlite3.Cursor, table: str, key: str, values: Sequence[Any]
+) -> Dict[Any, int]:
+    """
+    Map the unique `key` column to `id` for `values`, in chunks that stay under the sqlite
+    host parameter limit.
+    """
+    ids = {}
+    for i in range(0, len(values), BULK_LOOKUP_CHUNK):
+        chunk = values[i : i + BULK_LOOKUP_CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT id, {key} FROM {table} WHERE {key} IN ({marks})", tuple(chunk)
+        )
+        ids.update({row[key]: row["id"] for row in cursor.fetchall()})
+    return ids
+
+
+WORD = re.compile(r"\w+")
+
+
+def match_query(text: str) -> str:
+    """
+    An FTS5 query matching every word of `text`, the last one also as a prefix unless
+    `text` ends in whitespace.
+
+    Words are quoted, so punctuation or FTS5 operators typed by a user can't make the query
+    invalid.
+    """
+    words = WORD.findall(text)
+    terms = [f'"{word}"' for word in words]
+    if terms and not text[-1].isspace():
+        terms[-1] += "*"
+    return " ".join(terms)
 
 
 class People(Table):
@@ -61,18 +123,7 @@ class People(Table):
     team: str
     role: str
     is_self: bool = Field(default=False)
-
-    @staticmethod
-    def create_table() -> None:
-        sql = """CREATE TABLE IF NOT EXISTS people (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            team TEXT NOT NULL,
-            role TEXT NOT NULL,
-            is_self INTEGER NOT NULL DEFAULT 0
-        )"""
-        with SQLConnect() as cursor:
-            cursor.execute(sql)
+    cache: ClassVar[TableCache["People"]]
 
     @classmethod
     def insert(cls, username: str, team: str, role: str) -> "People":
@@ -86,29 +137,96 @@ class People(Table):
         person.id = id_
         return person
 
+    @classmethod
+    def insert_many(cls, rows: Iterable[Union["People", Dict[str, Any]]]) -> List[int]:
+        """
+        Insert people in a single transaction.
+
+        Returns:
+            List[int]: Ids of the inserted rows, in input order.
+        """
+        people = cls.coerce_many(rows)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO people (username, team, role, is_self) VALUES (?, ?, ?, ?)",
+                [(p.username, p.team, p.role, p.is_self) for p in people],
+            )
+            ids = inserted_ids(cursor, len(people))
+        for person, id_ in zip(people, ids):
+            person.id = id_
+        return ids
+
+    @classmethod
+    def upsert_many(cls, rows: Iterable[Union["People", Dict[str, Any]]]) -> List[int]:
+        """
+        Insert people, updating team, role and is_self of usernames that already exist.
+
+        Returns:
+            List[int]: Ids of the inserted or updated rows, in input order.
+        """
+        people = cls.coerce_many(rows)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO people (username, team, role, is_self) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (username) DO UPDATE SET team = excluded.team,"
+                " role = excluded.role, is_self = excluded.is_self",
+                [(p.username, p.team, p.role, p.is_self) for p in people],
+            )
+            id_map = ids_by_key(
+                cursor, "people", "username", list({p.username for p in people})
+            )
+        ids = [id_map[person.username] for person in people]
+        for person, id_ in zip(people, ids):
+            person.id = id_
+        return ids
+
     def update(self, team: str, role: str) -> None:
         with SQLConnect() as cursor:
             cursor.execute(
                 "UPDATE people SET team = ?, role = ?, username = ? WHERE id = ?",
-                (team, role, self.username),
+                (team, role, self.username, self.id),
             )
+        self.team, self.role = team, role
 
     def delete(self) -> None:
         with SQLConnect() as cursor:
             cursor.execute("DELETE FROM people WHERE id = ?", (self.id,))
         self.id = None
 
+    @classmethod
+    def load(cls) -> List["People"]:
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute("SELECT * FROM people ORDER BY id")
+            people = cursor.fetchall()
+        return [cls(**person) for person in people]
+
     @classmethod
     def search(
         cls, username: str | None = None, id: int | None = None
     ) -> List["People"]:
-        with SQLConnect() as cursor:
-            if username:
-                cursor.execute("SELECT * FROM people WHERE username = ?", (username,))
-            elif id:
-                cursor.execute("SELECT * FROM people WHERE id = ?", (id,))
-            else:
-                cursor.execute("SELECT * FROM people")
+        """
+        People by username, by id, or everyone, served from `People.cache`.
+        """
+        if username:
+            person = cls.cache.find(username)
+        elif id:
+            person = cls.cache.get(id)
+        else:
+            return cls.cache.all()
+        return [person] if person is not None else []
+
+    @classmethod
+    def page(cls, after: int | None = None, limit: int = 100) -> List["People"]:
+        """
+        Up to `limit` people in id order, following the id `after`.
+
+        Pages are keyset paginated, reading one is an index range scan however deep it is.
+        """
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT * FROM people WHERE id > ? ORDER BY id LIMIT ?",
+                (after or 0, limit),
+            )
             people = cursor.fetchall()
         return [cls(**person) for person in people]
 
@@ -118,17 +236,7 @@ class TaskType(Table):
     name: str = Field(primary_key=True)
     skill: Skill
     experience: float
-
-    @staticmethod
-    def create_table() -> str:
-        sql = """CREATE TABLE IF NOT EXISTS task_type (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            skill INTEGER NOT NULL,
-            experience REAL NOT NULL
-        )"""
-        with SQLConnect() as cursor:
-            cursor.execute(sql)
+    cache: ClassVar[TableCache["TaskType"]]
 
     @classmethod
     def insert(cls, name: str, skill: Skill, experience: float) -> "TaskType":
@@ -136,31 +244,101 @@ class TaskType(Table):
         with SQLConnect() as cursor:
             cursor.execute(
                 "INSERT INTO task_type (name, skill, experience) VALUES (?, ?, ?)",
-                (task.name, task.skill, task.experience),
+                (task.name, task.skill.value, task.experience),
             )
+            task.id = cursor.lastrowid
         return task
 
+    @classmethod
+    def insert_many(
+        cls, rows: Iterable[Union["TaskType", Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Insert task types in a single transaction.
+
+        Returns:
+            List[int]: Ids of the inserted rows, in input order.
+        """
+        tasks = cls.coerce_many(rows)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO task_type (name, skill, experience) VALUES (?, ?, ?)",
+                [(t.name, t.skill.value, t.experience) for t in tasks],
+            )
+            ids = inserted_ids(cursor, len(tasks))
+        for task, id_ in zip(tasks, ids):
+            task.id = id_
+        return ids
+
+    @classmethod
+    def upsert_many(
+        cls, rows: Iterable[Union["TaskType", Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Insert task types, updating skill and experience of names that already exist.
+
+        Returns:
+            List[int]: Ids of the inserted or updated rows, in input order.
+        """
+        tasks = cls.coerce_many(rows)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO task_type (name, skill, experience) VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET skill = excluded.skill,"
+                " experience = excluded.experience",
+                [(t.name, t.skill.value, t.experience) for t in tasks],
+            )
+            id_map = ids_by_key(
+                cursor, "task_type", "name", list({t.name for t in tasks})
+            )
+        ids = [id_map[task.name] for task in tasks]
+        for task, id_ in zip(tasks, ids):
+            task.id = id_
+        return ids
+
     def update(self, skill: Skill, experience: float) -> None:
         with SQLConnect() as cursor:
             cursor.execute(
                 "UPDATE task_type SET skill = ?, experience = ? WHERE id = ?",
-                (skill, experience, self.id),
+                (Skill(skill).value, experience, self.id),
             )
+        self.skill, self.experience = Skill(skill), experience
 
     def delete(self) -> None:
         with SQLConnect() as cursor:
             cursor.execute("DELETE FROM task_type WHERE id = ?", (self.id,))
         self.id = None
 
+    @classmethod
+    def load(cls) -> List["TaskType"]:
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute("SELECT * FROM task_type ORDER BY id")
+            tasks = cursor.fetchall()
+        return [cls(**task) for task in tasks]
+
     @classmethod
     def search(cls, name: str | None = None, id: int | None = None) -> List["TaskType"]:
-        with SQLConnect() as cursor:
-            if name:
-                cursor.execute("SELECT * FROM task_type WHERE name = ?", (name,))
-            elif id:
-                cursor.execute("SELECT * FROM task_type WHERE id = ?", (id,))
-            else:
-                cursor.execute("SELECT * FROM task_type")
+        """
+        Task types by name, by id, or all of them, served from `TaskType.cache`.
+        """
+        if name:
+            task = cls.cache.find(name)
+        elif id:
+            task = cls.cache.get(id)
+        else:
+            return cls.cache.all()
+        return [task] if task is not None else []
+
+    @classmethod
+    def page(cls, after: int | None = None, limit: int = 100) -> List["TaskType"]:
+        """
+        Up to `limit` task types in id order, following the id `after`.
+        """
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT * FROM task_type WHERE id > ? ORDER BY id LIMIT ?",
+                (after or 0, limit),
+            )
             tasks = cursor.fetchall()
         return [cls(**task) for task in tasks]
 
@@ -177,20 +355,19 @@ class EmotionLog(Table):
     resolved: bool = Field(default=False)
 
     @staticmethod
-    def create_table() -> str:
-        sql = """CREATE TABLE IF NOT EXISTS emotion_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feeling INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
-            duration INTEGER NOT NULL,
-            trigger TEXT NOT NULL,
-            reaction TEXT NOT NULL,
-            people_id TEXT,
-            task_id TEXT,
-            resolved INTEGER NOT NULL DEFAULT 0
-        )"""
-        with SQLConnect() as cursor:
-            cursor.execute(sql)
+    def link(
+        cursor: sqlite3.Cursor, log_id: int, people_id: List[int], task_id: List[int]
+    ) -> None:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO emotion_log_people (emotion_log_id, people_id)"
+            " VALUES (?, ?)",
+            [(log_id, id_) for id_ in people_id],
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO emotion_log_task (emotion_log_id, task_id)"
+            " VALUES (?, ?)",
+            [(log_id, id_) for id_ in task_id],
+        )
 
     @classmethod
     def insert(
@@ -203,33 +380,131 @@ class EmotionLog(Table):
         people_id: List[int],
         task_id: List[int],
     ) -> "EmotionLog":
+        feeling = Feeling(feeling)
         with SQLConnect() as cursor:
             cursor.execute(
                 "INSERT INTO emotion_log (feeling, timestamp, duration, trigger,"
-                " reaction, people_id, task_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (
-                    feeling,
-                    timestamp,
-                    duration,
-                    trigger,
-                    reaction,
-                    str(people_id),
-                    str(task_id),
-                ),
+                " reaction) VALUES (?, ?, ?, ?, ?)",
+                (feeling.value, to_epoch(timestamp), duration, trigger, reaction),
             )
             id_ = cursor.lastrowid
-        people = [people for id_ in people_id for people in People.search(id=id_)]
-        task = [task for id_ in task_id for task in TaskType.search(id=id_)]
-        return cls(
-            id=id_,
-            feeling=feeling,
-            timestamp=timestamp,
-            duration=duration,
-            trigger=trigger,
-            reaction=reaction,
-            people=people,
-            task=task,
+            cls.link(cursor, id_, people_id, task_id)
+        return cls.search(id=id_)[0]
+
+    @classmethod
+    def coerce_many(
+        cls, rows: Iterable[Union["EmotionLog", Dict[str, Any]]]
+    ) -> List["EmotionLog"]:
+        """
+        Validate a mix of models and dicts into a list of models.
+
+        Dicts may reference people and tasks by `people_id`/`task_id` lists instead of
+        carrying `people`/`task` models.
+        """
+        logs = []
+        for row in rows:
+            if isinstance(row, cls):
+                logs.append(row)
+                continue
+            row = dict(row)
+            people_id = row.pop("people_id", [])
+            task_id = row.pop("task_id", [])
+            log = cls(**row)
+            log.people = log.people or [
+                People.model_construct(id=id_) for id_ in people_id
+            ]
+            log.task = log.task or [TaskType.model_construct(id=id_) for id_ in task_id]
+            logs.append(log)
+        return logs
+
+    @staticmethod
+    def link_many(cursor: sqlite3.Cursor, logs: Sequence["EmotionLog"]) -> None:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO emotion_log_people (emotion_log_id, people_id)"
+            " VALUES (?, ?)",
+            [(log.id, person.id) for log in logs for person in log.people],
         )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO emotion_log_task (emotion_log_id, task_id)"
+            " VALUES (?, ?)",
+            [(log.id, task.id) for log in logs for task in log.task],
+        )
+
+    @classmethod
+    def insert_many(
+        cls, rows: Iterable[Union["EmotionLog", Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Insert emotion logs and their people/task links in a single transaction.
+
+        Returns:
+            List[int]: Ids of the inserted rows, in input order.
+        """
+        logs = cls.coerce_many(rows)
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO emotion_log (feeling, timestamp, duration, trigger,"
+                " reaction, resolved) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        log.feeling.value,
+                        to_epoch(log.timestamp),
+                        log.duration,
+                        log.trigger,
+                        log.reaction,
+                        log.resolved,
+                    )
+                    for log in logs
+                ],
+            )
+            ids = inserted_ids(cursor, len(logs))
+            for log, id_ in zip(logs, ids):
+                log.id = id_
+            cls.link_many(cursor, logs)
+        return ids
+
+    @classmethod
+    def upsert_many(
+        cls, rows: Iterable[Union["EmotionLog", Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Insert logs without an id and overwrite logs whose id already exists, replacing
+        their people/task links.
+
+        Returns:
+            List[int]: Ids of the inserted or updated rows, in input order.
+        """
+        logs = cls.coerce_many(rows)
+        existing = [log for log in logs if log.id is not None]
+        with SQLConnect() as cursor:
+            cursor.executemany(
+                "INSERT INTO emotion_log (id, feeling, timestamp, duration, trigger,"
+                " reaction, resolved) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET feeling = excluded.feeling,"
+                " timestamp = excluded.timestamp, duration = excluded.duration,"
+                " trigger = excluded.trigger, reaction = excluded.reaction,"
+                " resolved = excluded.resolved",
+                [
+                    (
+                        log.id,
+                        log.feeling.value,
+                        to_epoch(log.timestamp),
+                        log.duration,
+                        log.trigger,
+                        log.reaction,
+                        log.resolved,
+                    )
+                    for log in existing
+                ],
+            )
+            for table in ("emotion_log_people", "emotion_log_task"):
+                cursor.executemany(
+                    f"DELETE FROM {table} WHERE emotion_log_id = ?",
+                    [(log.id,) for log in existing],
+                )
+            cls.link_many(cursor, existing)
+            cls.insert_many([log for log in logs if log.id is None])
+        return [log.id for log in logs]
 
     def update(
         self,
@@ -244,18 +519,23 @@ class EmotionLog(Table):
         with SQLConnect() as cursor:
             cursor.execute(
                 "UPDATE emotion_log SET feeling = ?, timestamp = ?, duration = ?,"
-                " trigger = ?, reaction = ?, people_id = ?, task_id = ? WHERE id = ?",
+                " trigger = ?, reaction = ? WHERE id = ?",
                 (
-                    feeling,
-                    timestamp,
+                    Feeling(feeling).value,
+                    to_epoch(timestamp),
                     duration,
                     trigger,
                     reaction,
-                    people_id,
-                    task_id,
                     self.id,
                 ),
             )
+            cursor.execute(
+                "DELETE FROM emotion_log_people WHERE emotion_log_id = ?", (self.id,)
+            )
+            cursor.execute(
+                "DELETE FROM emotion_log_task WHERE emotion_log_id = ?", (self.id,)
+            )
+            self.link(cursor, self.id, people_id, task_id)
 
     def delete(self) -> None:
         with SQLConnect() as cursor:
@@ -269,39 +549,277 @@ class EmotionLog(Table):
         feeling: Feeling | None = None,
         time_range: Dict[str, datetime] | None = None,
     ) -> List["EmotionLog"]:
-        with SQLConnect() as cursor:
-            if id:
-                cursor.execute("SELECT * FROM emotion_log WHERE id = ?", (id,))
-            elif feeling:
-                cursor.execute(
-                    "SELECT * FROM emotion_log WHERE feeling = ?", (feeling,)
-                )
-            elif time_range:
-                start = time_range["start"]
-                end = time_range["end"]
-                cursor.execute(
-                    "SELECT * FROM emotion_log WHERE timestamp BETWEEN ? AND ?",
-                    (start, end),
+        """
+        Search emotion logs along with the people and tasks linked to them.
+        """
+        if id is not None:
+            where, params = "WHERE id = ?", (id,)
+        elif feeling is not None:
+            where, params = "WHERE feeling = ?", (Feeling(feeling).value,)
+        elif time_range:
+            where = "WHERE timestamp BETWEEN ? AND ?"
+            params = (to_epoch(time_range["start"]), to_epoch(time_range["end"]))
+        else:
+            where, params = "", ()
+        return cls.select(where, params)
+
+    @classmethod
+    def search_text(
+        cls, text: str, limit: int = 20, highlight: Tuple[str, str] = ("[", "]")
+    ) -> List["LogMatch"]:
+        """
+        The `limit` logs whose trigger or reaction best match `text`, with a snippet of the
+        matching text.
+
+        Every word of `text` has to match, ignoring case and diacritics, and english words
+        match on their stem, "deadlines" finds "deadline". Matches are looked up in the
+        full-text index and ranked by bm25, best first. Matched words in the snippet are
+        wrapped in `highlight`.
+        """
+        query = match_query(text)
+        if not query:
+            return []
+        start, end = highlight
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT rowid, snippet(emotion_log_fts, -1, ?, ?, '…', 12) AS snippet,"
+                " rank FROM emotion_log_fts WHERE emotion_log_fts MATCH ?"
+                " ORDER BY rank LIMIT ?",
+                (start, end, query, limit),
+            )
+            matches = cursor.fetchall()
+
+        marks = ", ".join("?" * len(matches))
+        ids = [match["rowid"] for match in matches]
+        logs = {log.id: log for log in cls.select(f"WHERE id IN ({marks})", ids)}
+        # A log deleted since it matched is left out.
+        return [
+            LogMatch(
+                log=logs[match["rowid"]], snippet=match["snippet"], rank=match["rank"]
+            )
+            for match in matches
+            if match["rowid"] in logs
+        ]
+
+    @classmethod
+    def page(cls, after: int | None = None, limit: int = 100) -> List["EmotionLog"]:
+        """
+        Up to `limit` emotion logs in id order, following the id `after`.
+
+        Pages are keyset paginated, reading one is an index range scan however deep it is.
+        """
+        return cls.select("WHERE id > ?", (after or 0,), limit=limit)
+
+    @staticmethod
+    def filters(
+        people_id: List[int] | None,
+        task_id: List[int] | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> Tuple[str, List[int]]:
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(to_epoch(end))
+        for table, column, ids in (
+            ("emotion_log_people", "people_id", people_id),
+            ("emotion_log_task", "task_id", task_id),
+        ):
+            if ids is not None:
+                marks = ", ".join("?" * len(ids))
+                conditions.append(
+                    f"id IN (SELECT emotion_log_id FROM {table}"
+                    f" WHERE {column} IN ({marks}))"
                 )
-            else:
-                cursor.execute("SELECT * FROM emotion_log")
+                params.extend(ids)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, params
+
+    @classmethod
+    def stats(
+        cls,
+        *fields: AggregateBy,
+        people_id: List[int] | None = None,
+        task_id: List[int] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Aggregation:
+        """
+        How often feelings were logged and for how long, over every combination of `fields`.
+
+        Logs are grouped by sqlite, by their start in the local timezone, and no log is
+        loaded into Python. Charts that take an `Aggregation` can plot the result.
+
+        Args:
+            fields (AggregateBy): One axis of the result per field, in order. `FEELING` and
+                the time fields `HOUR`, `DAY`, `DAY_OF_WEEK`, `WEEK` and `MONTH`.
+            people_id (List[int] | None, optional): Only logs with any of these people.
+            task_id (List[int] | None, optional): Only logs with any of these tasks.
+            start (datetime | None, optional): First timestamp. Defaults to the first log.
+            end (datetime | None, optional): Timestamp after the last. Defaults to no limit.
+
+        Returns:
+            Aggregation: Hours logged as `values` and the number of logs as `counts`.
+        """
+        if not fields:
+            raise ValueError("Emotion logs are aggregated by at least one field.")
+        for field in fields:
+            if field not in LOG_FIELD_SQL:
+                raise ValueError(f"Emotion logs can't be aggregated by {field.value}.")
+        where, params = cls.filters(people_id, task_id, start, end)
+        columns = ", ".join(LOG_FIELD_SQL[field] for field in fields)
+        groups = ", ".join(str(i + 1) for i in range(len(fields)))
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                f"SELECT {columns}, SUM(duration), COUNT(*) FROM ("
+                "SELECT feeling, duration,"
+                " datetime(timestamp, 'unixepoch', 'localtime') AS local"
+                f" FROM emotion_log {where}) GROUP BY {groups}",
+                params,
+            )
+            rows = [tuple(row) for row in cursor.fetchall()]
+
+        rows = np.array(rows, dtype=np.int64).reshape(-1, len(fields) + 2)
+        shape = tuple(AXIS_SIZE[field] for field in fields)
+        values = np.zeros(shape)
+        counts = np.zeros(shape, dtype=np.int64)
+        index = tuple(rows[:, i] for i in range(len(fields)))
+        values[index] = rows[:, -2] / MINUTES_IN_AN_HOUR
+        counts[index] = rows[:, -1]
+        return Aggregation(
+            values=values,
+            counts=counts,
+            fields=fields,
+            labels=tuple(log_axis_labels(field) for field in fields),
+        )
+
+    @classmethod
+    def daily_hours(
+        cls,
+        people_id: List[int] | None = None,
+        task_id: List[int] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hours logged per local day, the input of `plot_daily_heatmap`. Filters as `stats`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Days with logs, as days since the unix epoch, and
+                their hours.
+        """
+        where, params = cls.filters(people_id, task_id, start, end)
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT CAST(julianday(timestamp, 'unixepoch', 'localtime', 'start of day')"
+                " - julianday('1970-01-01') AS INTEGER) AS day, SUM(duration)"
+                f" FROM emotion_log {where} GROUP BY day ORDER BY day",
+                params,
+            )
+            rows = [tuple(row) for row in cursor.fetchall()]
+        rows = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        return rows[:, 0], rows[:, 1] / MINUTES_IN_AN_HOUR
+
+    @classmethod
+    def intervals(
+        cls,
+        people_id: List[int] | None = None,
+        task_id: List[int] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Columns of the logs in timestamp order, without loading them as models. Filters as
+        `stats`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Ids, start and end in epoch
+                seconds, and `Feeling` values.
+        """
+        where, params = cls.filters(people_id, task_id, start, end)
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT id, timestamp, timestamp + duration * 60, feeling"
+                f" FROM emotion_log {where} ORDER BY timestamp, id",
+                params,
+            )
+            rows = [tuple(row) for row in cursor.fetchall()]
+        rows = np.array(rows, dtype=np.int64).reshape(-1, 4)
+        return rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+
+    @classmethod
+    def select(
+        cls, where: str, params: Sequence[Any], limit: int | None = None
+    ) -> List["EmotionLog"]:
+        """
+        Logs matching `where` in id order, along with the people and tasks linked to them.
+
+        Logs and their links are read with one query each, regardless of the number of logs,
+        and linked people and tasks are looked up in the reference caches.
+        """
+        rows = f"{where} ORDER BY id"
+        if limit is not None:
+            rows, params = f"{rows} LIMIT ?", (*params, limit)
+
+        with SQLConnect(readonly=True) as cursor:
+            cursor.execute(f"SELECT * FROM emotion_log {rows}", params)
             log_data = cursor.fetchall()
+            cursor.execute(
+                "SELECT emotion_log_id, people_id FROM emotion_log_people"
+                f" WHERE emotion_log_id IN (SELECT id FROM emotion_log {rows})",
+                params,
+            )
+            people_links = cursor.fetchall()
+            cursor.execute(
+                "SELECT emotion_log_id, task_id FROM emotion_log_task"
+                f" WHERE emotion_log_id IN (SELECT id FROM emotion_log {rows})",
+                params,
+            )
+            task_links = cursor.fetchall()
+
+        # People and tasks come from the reference caches.
+        people_by_id, _ = People.cache.snapshot()
+        tasks_by_id, _ = TaskType.cache.snapshot()
+        people: Dict[int, List[People]] = defaultdict(list)
+        tasks: Dict[int, List[TaskType]] = defaultdict(list)
+        # A row deleted since the links were read is left out, as a later read would.
+        for log_id, people_id in people_links:
+            if people_id in people_by_id:
+                people[log_id].append(people_by_id[people_id].model_copy())
+        for log_id, task_id in task_links:
+            if task_id in tasks_by_id:
+                tasks[log_id].append(tasks_by_id[task_id].model_copy())
 
         logs = []
         for log_ in log_data:
             log = {}
             log["id"] = log_["id"]
-            log["people"] = [
-                people for id_ in log_["people_id"] for people in People.search(id=id_)
-            ]
-            log["task"] = [
-                task for id_ in log_["task_id"] for task in TaskType.search(id=id_)
-            ]
-            log["timestamp"] = datetime.fromisoformat(log_["timestamp"])
+            log["people"] = people[log_["id"]]
+            log["task"] = tasks[log_["id"]]
             log["feeling"] = Feeling(log_["feeling"])
-            log["timestamp"] = datetime.fromisoformat(log_["timestamp"])
+            log["timestamp"] = from_epoch(log_["timestamp"])
             log["duration"] = log_["duration"]
             log["trigger"] = log_["trigger"]
             log["reaction"] = log_["reaction"]
+            log["resolved"] = log_["resolved"]
             logs.append(cls(**log))
         return logs
+
+
+def log_axis_labels(field: AggregateBy) -> np.ndarray:
+    if field == AggregateBy.FEELING:
+        return np.array([feeling.name.lower() for feeling in Feeling])
+    return np.arange(AXIS_SIZE[field])
+
+
+class LogMatch(BaseModel):
+    log: EmotionLog
+    snippet: str
+    rank: float
+
+
+People.cache = TableCache(People.load, "username")
+TaskType.cache = TableCache(TaskType.load, "name")
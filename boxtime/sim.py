@@ -1,61 +1,358 @@
+"""
+Synthetic calendars for load tests.
+
+```shell
+python -m boxtime.sim --users 1000 --years 2 --output assets/events/simulated.json
+```
+
+Every user gets a calendar per year with workday meetings (some overlapping), weekly or
+fortnightly recurring series, all-day events and attendees drawn from their team. The output
+is a JSON array of raw events, the same format as the event caches, so it can be read with
+`iter_json_array` or `EventService.stream`.
+
+Each (user, year) calendar is generated with NumPy from its own seed, derived from the
+profile seed, the user and the year. Output is therefore identical for any number of workers,
+and calendars are written as they are generated, in order.
+"""
+
+import argparse
 import json
-import random
-import pytz
-from copy import deepcopy
-from datetime import datetime, timedelta
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, TextIO, Tuple
 
 import numpy as np
+from pydantic import BaseModel, Field
+
+from boxtime.vendor.frame import day_of_week
+from boxtime.vendor.colors import Color
+
+DEFAULT_TAG_WEIGHTS = {
+    Color.LAVENDER: 0.1,
+    Color.SAGE: 0.1,
+    Color.GRAPE: 0.01,
+    Color.FLAMINGO: 0.01,
+    Color.BANANA: 0.16,
+    Color.TANGERINE: 0.1,
+    Color.PEACOCK: 0.01,
+    Color.GRAPHITE: 0.1,
+    Color.BLUEBERRY: 0.01,
+    Color.BASIL: 0.2,
+    Color.TOMATO: 0.2,
+}
+
+# Zones without daylight saving, so a fixed offset is right all year.
+TIME_ZONES = [
+    ("Asia/Kolkata", "+05:30"),
+    ("UTC", "+00:00"),
+    ("Asia/Singapore", "+08:00"),
+    ("America/Sao_Paulo", "-03:00"),
+    ("Asia/Tokyo", "+09:00"),
+]
+DURATIONS = np.array([15, 30, 45, 60, 90])
+CREATED = "2020-01-01T00:00:00.000Z"
+DOMAIN = "example.com"
+
+
+class Profile(BaseModel):
+    """
+    Shape of the generated calendars.
+    """
+
+    users: int = Field(default=1, ge=1)
+    years: int = Field(default=1, ge=1)
+    first_year: int = Field(default=2023)
+    seed: int = Field(default=0)
+    tag_weights: Dict[Color, float] = Field(default=DEFAULT_TAG_WEIGHTS)
+    events_per_day: Tuple[int, int] = Field(default=(4, 10))
+    overlap: float = Field(default=0.1, ge=0, le=1)
+    series: int = Field(default=5, ge=0)
+    all_day: float = Field(default=0.05, ge=0, le=1)
+    attendees: int = Field(default=6, ge=0)
+    team_size: int = Field(default=50, ge=1)
+    weekends: bool = Field(default=False)
+
+
+def workdays(year: int, weekends: bool = False) -> np.ndarray:
+    days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+    if weekends:
+        return days
+    return days[day_of_week(days) < 5]
+
+
+def sample_colors(
+    rng: np.random.Generator, weights: Dict[Color, float], n: int
+) -> np.ndarray:
+    """
+    Color codes drawn with `weights`, `Color.UNASSIGNED` events get no color.
+    """
+    codes = np.array([int(color.value) for color in weights])
+    p = np.array(list(weights.values()), dtype=np.float64)
+    return rng.choice(codes, size=n, p=p / p.sum())
+
+
+def meetings(
+    rng: np.random.Generator, profile: Profile, days: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Hourly meetings from 9:00 on every day. With probability `overlap` a meeting starts
+    during the previous one instead.
+    """
+    lo, hi = profile.events_per_day
+    counts = rng.integers(lo, hi + 1, size=len(days))
+    n = int(counts.sum())
+    slot = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+    start = np.repeat(days, counts).astype("datetime64[m]") + 9 * 60 + slot * 60
+    minutes = rng.choice(DURATIONS, size=n)
+
+    overlapping = np.flatnonzero((rng.random(n) < profile.overlap) & (slot > 0))
+    shift = rng.random(len(overlapping)) * (minutes[overlapping - 1] // 15)
+    start[overlapping] = start[overlapping - 1] + shift.astype(np.int64) * 15
+    return {
+        "start": start,
+        "minutes": minutes,
+        "series": np.full(n, -1),
+    }
+
+
+def recurring(
+    rng: np.random.Generator, profile: Profile, year: int
+) -> Dict[str, np.ndarray]:
+    """
+    `profile.series` weekly or fortnightly workday series, one event per occurrence.
+    """
+    k = profile.series
+    weekday = rng.integers(0, 5, size=k)
+    hour = rng.integers(9, 18, size=k)
+    minutes = rng.choice([30, 60], size=k)
+    interval = rng.choice([1, 2], size=k)
+
+    new_year = np.datetime64(f"{year}-01-01", "D")
+    first_monday = new_year + (7 - day_of_week(new_year)) % 7
+    week = np.arange(53)[:, None]
+    day = first_monday + week * 7 + weekday[None, :]
+    keep = (week % interval[None, :] == 0) & (day < np.datetime64(f"{year + 1}-01-01"))
+    week_index, series = np.nonzero(keep)
+    start = day[week_index, series].astype("datetime64[m]") + hour[series] * 60
+    return {
+        "start": start,
+        "minutes": minutes[series],
+        "series": series,
+    }
+
+
+def calendar(profile: Profile, user: int, year: int) -> Dict[str, np.ndarray]:
+    """
+    Columns of every event of `user` in `year`, sorted by start.
+
+    - `start`: local start time (datetime64[m]).
+    - `minutes`: duration, 0 for all-day events.
+    - `series`: index of the recurring series, -1 for single events.
+    - `color`: color code.
+    - `first_attendee`, `n_attendees`: a run of consecutive teammates invited.
+    """
+    rng = np.random.default_rng([profile.seed, user, year])
+    days = workdays(year, profile.weekends)
+    parts = [meetings(rng, profile, days), recurring(rng, profile, year)]
+    all_day = days[rng.random(len(days)) < profile.all_day]
+    parts.append(
+        {
+            "start": all_day.astype("datetime64[m]"),
+            "minutes": np.zeros(len(all_day), dtype=np.int64),
+            "series": np.full(len(all_day), -1),
+        }
+    )
+    columns = {
+        name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+    }
+    n = len(columns["start"])
+
+    # Occurrences of a series share color and attendees.
+    n_series = profile.series
+    color = sample_colors(rng, profile.tag_weights, n + n_series)
+    first = rng.integers(0, profile.team_size, size=n + n_series)
+    count = rng.integers(0, profile.attendees + 1, size=n + n_series)
+    series = columns["series"]
+    pick = np.where(series >= 0, n + series, np.arange(n))
+    columns["color"] = color[pick]
+    columns["first_attendee"] = first[pick]
+    columns["n_attendees"] = np.minimum(count[pick], profile.team_size)
+
+    order = np.argsort(columns["start"], kind="stable")
+    return {name: column[order] for name, column in columns.items()}
+
+
+def render_calendar(profile: Profile, user: int, year: int) -> str:
+    """
+    The events of a calendar as the comma separated elements of a JSON array.
+    """
+    columns = calendar(profile, user, year)
+    time_zone, offset = TIME_ZONES[user % len(TIME_ZONES)]
+    start = columns["start"]
+    end = start + columns["minutes"]
+    start_text = np.datetime_as_string(start, unit="s")
+    end_text = np.datetime_as_string(end, unit="s")
+    start_date = np.datetime_as_string(start.astype("datetime64[D]"))
+    end_date = np.datetime_as_string(start.astype("datetime64[D]") + 1)
+    team = user - user % profile.team_size
+    owner = {"email": f"user{user}@{DOMAIN}", "self": True}
+    members = [
+        {"email": f"user{team + k}@{DOMAIN}", "responseStatus": "accepted"}
+        for k in range(profile.team_size)
+    ]
+    members += members  # Runs of teammates wrap around the team.
+    unassigned = int(Color.UNASSIGNED.value)
+
+    events = []
+    for i, (minutes, series, color, first, n_attendees) in enumerate(
+        zip(
+            columns["minutes"].tolist(),
+            columns["series"].tolist(),
+            columns["color"].tolist(),
+            columns["first_attendee"].tolist(),
+            columns["n_attendees"].tolist(),
+        )
+    ):
+        if series >= 0:
+            parent = f"u{user}y{year}s{series}"
+            id_ = f"{parent}_{start_text[i].replace('-', '').replace(':', '')}"
+            title = f"Series {series}"
+        else:
+            parent = None
+            id_ = f"u{user}y{year}e{i}"
+            title = f"Event {i % 97}"
+        if minutes:
+            start_time = {"dateTime": start_text[i] + offset, "timeZone": time_zone}
+            end_time = {"dateTime": end_text[i] + offset, "timeZone": time_zone}
+        else:
+            start_time = {"date": start_date[i], "timeZone": time_zone}
+            end_time = {"date": end_date[i], "timeZone": time_zone}
+        event = {
+            "id": id_,
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.{DOMAIN}/event?eid={id_}",
+            "created": CREATED,
+            "updated": CREATED,
+            "summary": title,
+            "creator": owner,
+            "organizer": owner,
+            "start": start_time,
+            "end": end_time,
+            "attendees": members[first : first + n_attendees],
+        }
+        if color != unassigned:
+            event["colorId"] = str(color)
+        if parent:
+            event["recurringEventId"] = parent
+        events.append(event)
+    return json.dumps(events, check_circular=False)[1:-1]
 
 
-with open("./assets/events/primary_2023-12-01_2023-12-31_False_False.bak", "r") as f:
-    real_events = json.load(f)
+def render_task(task: Tuple[Profile, int, int]) -> str:
+    return render_calendar(*task)
 
 
-def main():
-    mock_events = []
-    color_ids = [str(i) for i in range(1, 12)]
-    probs = np.zeros(11)
-    probs[0] = 0.1
-    probs[1] = 0.1
-    probs[2] = 0.01
-    probs[3] = 0.01
-    probs[4] = 0.16
-    probs[5] = 0.1
-    probs[6] = 0.01
-    probs[7] = 0.1
-    probs[8] = 0.01
-    probs[9] = 0.2
-    probs[10] = 0.2
+def generate(profile: Profile, max_workers: int = 1) -> Iterator[str]:
+    """
+    JSON of every (user, year) calendar in order, from a pool of `max_workers` processes.
 
-    print("probs", sum(probs))
+    At most two calendars per worker are in flight, so memory doesn't grow with the number
+    of users.
+    """
+    tasks = (
+        (profile, user, year)
+        for user in range(profile.users)
+        for year in range(profile.first_year, profile.first_year + profile.years)
+    )
+    if max_workers <= 1:
+        yield from map(render_task, tasks)
+        return
 
-    for i in range(365):
-        current_date = datetime(2023, 1, 1) + timedelta(days=i + 1 - 1)
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=get_context("spawn")
+    ) as pool:
+        pending: deque[Future] = deque()
+        for task in tasks:
+            pending.append(pool.submit(render_task, task))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
-        if current_date.weekday() >= 5:
-            current_date += timedelta(days=1)
-            continue
 
-        n = random.randint(4, 10)
-        selected_objects = deepcopy(random.sample(real_events, n))
+def write(fp: TextIO, profile: Profile, max_workers: int = 1) -> None:
+    """
+    Stream the generated calendars to `fp` as one JSON array.
+    """
+    fp.write("[")
+    separator = ""
+    for chunk in generate(profile, max_workers):
+        if chunk:
+            fp.write(separator + chunk)
+            separator = ", "
+    fp.write("]")
 
-        for i, obj in enumerate(selected_objects):
-            start_dt = current_date.replace(
-                hour=9 + i, minute=0, second=0, microsecond=0, tzinfo=pytz.utc
-            )
 
-            end_dt = start_dt + timedelta(hours=1)
+def parse_weights(text: str) -> Dict[Color, float]:
+    """
+    `1=0.2,5=0.5,12=0.3` to weights by color id.
+    """
+    weights = {}
+    for pair in text.split(","):
+        color_id, weight = pair.split("=")
+        weights[Color(color_id.strip())] = float(weight)
+    return weights
 
-            obj["start"]["dateTime"] = start_dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-            obj["end"]["dateTime"] = end_dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-            selected_color_id = np.random.choice(color_ids, p=probs)
-            obj["colorId"] = selected_color_id
 
-            mock_events.append(obj)
-        current_date += timedelta(days=1)
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m boxtime.sim", description="Generate synthetic calendars."
+    )
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--first-year", type=int, default=2023)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--tag-weights",
+        type=parse_weights,
+        default=DEFAULT_TAG_WEIGHTS,
+        help="Relative weight of each color id, e.g. 1=0.2,5=0.5,12=0.3.",
+    )
+    parser.add_argument("--min-events", type=int, default=4, help="Per workday.")
+    parser.add_argument("--max-events", type=int, default=10, help="Per workday.")
+    parser.add_argument("--overlap", type=float, default=0.1)
+    parser.add_argument("--series", type=int, default=5, help="Per user and year.")
+    parser.add_argument("--all-day", type=float, default=0.05)
+    parser.add_argument("--attendees", type=int, default=6, help="At most.")
+    parser.add_argument("--team-size", type=int, default=50)
+    parser.add_argument("--weekends", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--output", default="-", help="File to write, standard output by default."
+    )
+    args = parser.parse_args(argv)
 
-    with open("./assets/events/primary_2023-12-01_2023-12-31_False_False", "w") as f:
-        json.dump(mock_events, f)
+    profile = Profile(
+        users=args.users,
+        years=args.years,
+        first_year=args.first_year,
+        seed=args.seed,
+        tag_weights=args.tag_weights,
+        events_per_day=(args.min_events, args.max_events),
+        overlap=args.overlap,
+        series=args.series,
+        all_day=args.all_day,
+        attendees=args.attendees,
+        team_size=args.team_size,
+        weekends=args.weekends,
+    )
+    output = nullcontext(sys.stdout) if args.output == "-" else open(args.output, "w")
+    with output as fp:
+        write(fp, profile, max_workers=args.workers)
 
 
 if __name__ == "__main__":
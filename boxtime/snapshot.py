@@ -0,0 +1,478 @@
+"""
+Columnar snapshots of the database and the event cache.
+
+```shell
+boxtime export snapshots/2024-01
+boxtime import snapshots/2024-01
+```
+
+A snapshot is a directory with a `manifest.json` and one `.npy` file per column, so columns
+can be memory-mapped and read without parsing anything. `--compress` writes the same arrays
+into a single compressed `.npz` instead, smaller to move around but read into memory.
+
+Strings are dictionary-encoded: an int32 `codes` column indexes a vocabulary of distinct
+values, kept as one utf-8 `vocab` blob and the `offsets` of every value in it. Code -1 is
+`None`.
+
+Events are stored once however many cache files hold them, sorted by start, with the columns
+of an `EventFrame` and their raw JSON. `event_file` maps every cache file to its events, so
+importing writes the cache files back as they were.
+
+```python
+snapshot = Snapshot.open("snapshots/2024-01")
+frame = snapshot.events(tags)
+logs = snapshot.log_intervals()
+```
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.migrations import MIGRATIONS, migrate
+from boxtime.vendor.frame import EventFrame
+from boxtime.vendor.sync import RawEvent
+from boxtime.vendor.colors import Color
+from boxtime.vis.overlap import LogIntervals
+
+FORMAT = 1
+MANIFEST = "manifest.json"
+COMPRESSED = ".npz"
+EVENTS_DIR = Path("assets", "events")
+SYNC_SUFFIX = ".sync.json"
+STRING = "string"
+
+# Columns of every exported table, in insert order. Strings are dictionary-encoded.
+TABLES: Dict[str, Dict[str, str]] = {
+    "people": {
+        "id": "int64",
+        "username": STRING,
+        "team": STRING,
+        "role": STRING,
+        "is_self": "int8",
+    },
+    "task_type": {
+        "id": "int64",
+        "name": STRING,
+        "skill": "int8",
+        "experience": "float64",
+    },
+    "emotion_log": {
+        "id": "int64",
+        "feeling": "int8",
+        "timestamp": "int64",
+        "duration": "int64",
+        "trigger": STRING,
+        "reaction": STRING,
+        "resolved": "int8",
+    },
+    "emotion_log_people": {"emotion_log_id": "int64", "people_id": "int64"},
+    "emotion_log_task": {"emotion_log_id": "int64", "task_id": "int64"},
+}
+EVENT_COLUMNS = {
+    "calendar": STRING,
+    "id": STRING,
+    "title": STRING,
+    "start": "int64",
+    "end": "int64",
+    "offset": "int32",
+    "color": "int8",
+    "raw": STRING,
+}
+EVENT_FILE_COLUMNS = {"file": STRING, "event": "int64"}
+
+Arrays = Dict[str, np.ndarray]
+
+
+def encode_strings(values: Sequence[str | None]) -> Arrays:
+    """
+    Dictionary-encode strings into `codes`, `vocab` and `offsets` arrays.
+    """
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter(
+        (
+            -1 if value is None else lookup.setdefault(value, len(lookup))
+            for value in values
+        ),
+        dtype=np.int32,
+        count=len(values),
+    )
+    blobs = [value.encode() for value in lookup]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    vocab = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    return {"codes": codes, "vocab": vocab, "offsets": offsets}
+
+
+class StringColumn:
+    """
+    A dictionary-encoded string column, decoded on access.
+    """
+
+    def __init__(self, codes: np.ndarray, vocab: np.ndarray, offsets: np.ndarray):
+        self.codes = codes
+        self.blob = vocab
+        self.offsets = offsets
+
+    def value(self, code: int) -> str | None:
+        if code < 0:
+            return None
+        start, end = self.offsets[code], self.offsets[code + 1]
+        return bytes(self.blob[start:end]).decode()
+
+    def vocab(self) -> np.ndarray:
+        """
+        Distinct values, with a trailing `None` that code -1 indexes.
+        """
+        data = self.blob.tobytes()
+        bounds = self.offsets.tolist()
+        values = [data[a:b].decode() for a, b in zip(bounds, bounds[1:])]
+        return np.array(values + [None], dtype=object)
+
+    def values(self) -> np.ndarray:
+        return self.vocab()[self.codes]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str | None:
+        return self.value(int(self.codes[i]))
+
+
+class RawEvents(Sequence[RawEvent]):
+    """
+    Raw events of a snapshot, parsed one at a time when an `EventFrame` row is accessed.
+    """
+
+    def __init__(self, column: StringColumn):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, i: int) -> RawEvent:
+        return json.loads(self.column[i])
+
+
+def columns(arrays: Arrays, table: str, spec: Dict[str, str], data: Dict[str, Any]):
+    """
+    Add the columns of `table` to `arrays`, named `<table>.<column>[.<part>]`.
+    """
+    for column, dtype in spec.items():
+        if dtype == STRING:
+            for part, array in encode_strings(data[column]).items():
+                arrays[f"{table}.{column}.{part}"] = array
+        else:
+            arrays[f"{table}.{column}"] = np.asarray(data[column], dtype=dtype)
+
+
+def read_tables() -> Tuple[Arrays, Dict[str, int]]:
+    """
+    Every exported table, read in one transaction so the snapshot is consistent.
+    """
+    arrays: Arrays = {}
+    rows: Dict[str, int] = {}
+    with SQLConnect(readonly=True) as cursor:
+        for table, spec in TABLES.items():
+            names = ", ".join(spec)
+            key = next(iter(spec))
+            cursor.execute(f"SELECT {names} FROM {table} ORDER BY {key}")
+            records = cursor.fetchall()
+            data = {column: [row[column] for row in records] for column in spec}
+            columns(arrays, table, spec, data)
+            rows[table] = len(records)
+    return arrays, rows
+
+
+def file_calendar(name: str) -> str:
+    """
+    Calendar id of a cache file, named by `EventService.cache_path` or `SyncCache`.
+    """
+    if name.endswith(SYNC_SUFFIX):
+        return name[: -len(SYNC_SUFFIX)].rsplit("_", 1)[0]
+    return name.rsplit("_", 4)[0]
+
+
+def read_event_files(
+    events_dir: Path,
+) -> Tuple[List[RawEvent], List[str], Dict[str, Dict[str, Any]], Arrays]:
+    """
+    Distinct events of every cache file, their calendars, the files and what they hold.
+    """
+    events: List[RawEvent] = []
+    calendars: List[str] = []
+    index: Dict[Tuple[str, str], int] = {}
+    files: Dict[str, Dict[str, Any]] = {}
+    file_names, file_events = [], []
+    paths = sorted(events_dir.glob("*")) if events_dir.exists() else []
+    for path in paths:
+        if not path.is_file() or path.name.endswith(".tmp"):
+            continue
+        with open(path) as f:
+            content = json.load(f)
+        if path.name.endswith(SYNC_SUFFIX):
+            files[path.name] = {"kind": "sync", "sync_token": content["sync_token"]}
+            items = list(content["items"].values())
+        else:
+            files[path.name] = {"kind": "range"}
+            items = content
+        calendar = file_calendar(path.name)
+        for item in items:
+            key = (calendar, json.dumps(item, sort_keys=True))
+            if key not in index:
+                index[key] = len(events)
+                events.append(item)
+                calendars.append(calendar)
+            file_names.append(path.name)
+            file_events.append(index[key])
+    return events, calendars, files, {"file": file_names, "event": file_events}
+
+
+def compressed_path(path: Path) -> Path:
+    """
+    File of a compressed snapshot. Like `np.savez`, `.npz` is added to names without it.
+    """
+    path = Path(path)
+    if path.suffix == COMPRESSED:
+        return path
+    return path.with_name(path.name + COMPRESSED)
+
+
+def export(
+    path: Path, events_dir: Path = EVENTS_DIR, compress: bool = False
+) -> Dict[str, Any]:
+    """
+    Write the database tables and cached events to a snapshot at `path`.
+
+    Args:
+        path (Path): Directory to create, or file with `compress`, `.npz` is added if
+            missing.
+        events_dir (Path, optional): Event cache to export. Defaults to `assets/events`.
+        compress (bool, optional): Write one compressed `.npz` instead of a directory of
+            memory-mappable `.npy` files. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+    """
+    migrate()
+    arrays, rows = read_tables()
+
+    items, calendars, files, membership = read_event_files(events_dir)
+    frame = EventFrame.from_items(items, {})
+    order = frame.row
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    raw = [json.dumps(items[i]) for i in order.tolist()]
+    event_data = {
+        "calendar": [calendars[i] for i in order.tolist()],
+        "id": frame.id.tolist(),
+        "title": frame.title.tolist(),
+        "start": frame.start,
+        "end": frame.end,
+        "offset": frame.offset,
+        "color": frame.color,
+        "raw": raw,
+    }
+    columns(arrays, "event", EVENT_COLUMNS, event_data)
+    membership["event"] = position[np.asarray(membership["event"], dtype=np.int64)]
+    columns(arrays, "event_file", EVENT_FILE_COLUMNS, membership)
+    rows["event"] = len(frame)
+    rows["event_file"] = len(membership["file"])
+
+    manifest = {
+        "format": FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "schema_version": len(MIGRATIONS),
+        "rows": rows,
+        "tables": {**TABLES, "event": EVENT_COLUMNS, "event_file": EVENT_FILE_COLUMNS},
+        "files": files,
+    }
+    path = Path(path)
+    if compress:
+        path = compressed_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_bytes = np.frombuffer(json.dumps(manifest).encode(), dtype=np.uint8)
+        np.savez_compressed(path, manifest=manifest_bytes, **arrays)
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", array)
+        with open(path / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class Snapshot:
+    """
+    A snapshot opened for reading. Columns of a directory snapshot are memory-mapped.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], arrays: Any):
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @classmethod
+    def open(cls, path: Path) -> "Snapshot":
+        """
+        The snapshot directory at `path`, or else the compressed snapshot, named the same
+        way `export` names it.
+        """
+        path = Path(path)
+        if path.is_dir():
+            with open(path / MANIFEST) as f:
+                manifest = json.load(f)
+            arrays = MappedArrays(path)
+        else:
+            arrays = np.load(compressed_path(path))
+            manifest = json.loads(arrays["manifest"].tobytes())
+        if manifest["format"] > FORMAT:
+            raise ValueError(f"Snapshot format {manifest['format']} isn't supported.")
+        return cls(manifest, arrays)
+
+    def column(self, table: str, column: str) -> np.ndarray | StringColumn:
+        if self.manifest["tables"][table][column] == STRING:
+            parts = (
+                f"{table}.{column}.{part}" for part in ("codes", "vocab", "offsets")
+            )
+            return StringColumn(*(self.arrays[name] for name in parts))
+        return self.arrays[f"{table}.{column}"]
+
+    def table(self, table: str) -> Dict[str, np.ndarray | StringColumn]:
+        return {
+            column: self.column(table, column)
+            for column in self.manifest["tables"][table]
+        }
+
+    def events(self, tags: Dict[Color, str]) -> EventFrame:
+        """
+        Every event as an `EventFrame`, from the stored columns. Raw events are only parsed
+        for rows turned into `Event`s.
+        """
+        ids = self.column("event", "id")
+        titles = self.column("event", "title")
+        return EventFrame(
+            start=self.column("event", "start"),
+            end=self.column("event", "end"),
+            offset=self.column("event", "offset"),
+            color=self.column("event", "color"),
+            id_code=ids.codes,
+            title_code=titles.codes,
+            row=np.arange(len(ids)),
+            ids=ids.vocab(),
+            titles=titles.vocab(),
+            source=RawEvents(self.column("event", "raw")),
+            tags=tags,
+        )
+
+    def log_intervals(self) -> LogIntervals:
+        start = self.column("emotion_log", "timestamp")
+        order = np.argsort(start, kind="stable")
+        duration = self.column("emotion_log", "duration")
+        return LogIntervals(
+            id=self.column("emotion_log", "id")[order],
+            start=start[order],
+            end=(start + duration * 60)[order],
+            feeling=self.column("emotion_log", "feeling")[order].astype(np.int64),
+        )
+
+    def event_files(self) -> Iterator[Tuple[str, Dict[str, Any], List[RawEvent]]]:
+        """
+        Every cache file with its metadata and events, in the order they were stored.
+        """
+        files = self.column("event_file", "file")
+        rows = self.column("event_file", "event")
+        raw = self.column("event", "raw")
+        names = files.vocab()
+        for code, name in enumerate(names[:-1]):
+            events = [json.loads(raw[i]) for i in rows[files.codes == code].tolist()]
+            yield name, self.manifest["files"][name], events
+
+
+class MappedArrays:
+    """
+    The `.npy` files of a snapshot directory, memory-mapped on first access.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.loaded: Arrays = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self.loaded:
+            self.loaded[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return self.loaded[name]
+
+
+def import_(
+    path: Path, events_dir: Path = EVENTS_DIR, replace: bool = False
+) -> Dict[str, int]:
+    """
+    Load a snapshot into the database and the event cache.
+
+    Rows keep their ids, so links between them hold. The full-text index and event rollups
+    are rebuilt from the imported data.
+
+    Args:
+        path (Path): Snapshot written by `export`.
+        events_dir (Path, optional): Event cache to write to. Defaults to `assets/events`.
+        replace (bool, optional): Replace the existing people, tasks and emotion logs, and
+            overwrite cache files of the same name. Without it, importing into a database
+            that has any of these rows fails, and existing cache files are kept.
+
+    Returns:
+        Dict[str, int]: Rows imported per table, and cache files written.
+    """
+    from boxtime.db.rollup import EventRollup
+
+    snapshot = Snapshot.open(path)
+    if snapshot.manifest["schema_version"] > len(MIGRATIONS):
+        raise ValueError("The snapshot was exported by a newer version of boxtime.")
+    migrate()
+
+    imported = {}
+    with SQLConnect.transaction() as cursor:
+        existing = sum(
+            cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in TABLES
+        )
+        if existing and not replace:
+            raise ValueError(
+                "The database isn't empty, pass `replace` to overwrite it."
+            )
+        for table in reversed(TABLES):
+            cursor.execute(f"DELETE FROM {table}")
+        for table, spec in TABLES.items():
+            data = []
+            for column in spec:
+                values = snapshot.column(table, column)
+                if isinstance(values, StringColumn):
+                    values = values.values()
+                data.append(values.tolist())
+            names = ", ".join(spec)
+            marks = ", ".join("?" * len(spec))
+            cursor.executemany(
+                f"INSERT INTO {table} ({names}) VALUES ({marks})", zip(*data)
+            )
+            imported[table] = len(data[0])
+
+    events_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name, meta, events in snapshot.event_files():
+        target = events_dir / name
+        if target.exists() and not replace:
+            continue
+        with open(target, "w") as f:
+            if meta["kind"] == "sync":
+                items = {event["id"]: event for event in events}
+                json.dump({"sync_token": meta["sync_token"], "items": items}, f)
+            else:
+                json.dump(events, f)
+        written += 1
+        if meta["kind"] == "sync" and name.endswith(f"_True{SYNC_SUFFIX}"):
+            EventRollup.rebuild(file_calendar(name), events)
+    imported["event_files"] = written
+    return imported
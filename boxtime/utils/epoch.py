@@ -0,0 +1,20 @@
+from datetime import datetime, timezone, tzinfo
+
+
+def to_epoch(dt: datetime) -> int:
+    """
+    Seconds since the unix epoch.
+
+    Naive datetimes are interpreted in the local timezone, which is what `datetime.now()`
+    produces in the TUI.
+    """
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return int(dt.timestamp())
+
+
+def from_epoch(seconds: int, tz: tzinfo | None = None) -> datetime:
+    """
+    A tz-aware datetime for `seconds` since the unix epoch, in `tz` or the local timezone.
+    """
+    return datetime.fromtimestamp(seconds, timezone.utc).astimezone(tz)
@@ -0,0 +1,75 @@
+import json
+import re
+from typing import Any, Iterable, Iterator, TextIO
+
+NEXT_TOKEN = re.compile(r"\s*(\S?)")
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    The file is read `chunk_size` characters at a time and only the element being decoded is
+    buffered, so memory doesn't grow with the size of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill() -> None:
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip(" \t\r\n")
+    if buffer[pos : pos + 1] != "[":
+        raise ValueError("Expected a JSON array.")
+    pos += 1
+
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array.")
+        if buffer[pos] == "]":
+            return
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        following = NEXT_TOKEN.match(buffer, end).group(1)
+        if following not in (",", "]"):
+            # A number cut off at the end of the buffer decodes to a prefix of itself, only
+            # accept an element once the delimiter after it has been read.
+            if eof:
+                raise ValueError(f"Expected ',' or ']' at position {end}.")
+            fill()
+            continue
+        pos = end
+        yield element
+
+
+def write_json_array(fp: TextIO, elements: Iterable[Any]) -> Iterator[Any]:
+    """
+    Write `elements` to `fp` as a JSON array while passing them through.
+
+    The array is only closed once the iterator is exhausted.
+    """
+    fp.write("[")
+    for i, element in enumerate(elements):
+        if i:
+            fp.write(", ")
+        json.dump(element, fp)
+        yield element
+    fp.write("]")
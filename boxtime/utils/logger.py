@@ -1,9 +1,14 @@
+from pathlib import Path
+
 from loguru import logger
 
+# Next to the database, so running from any directory leaves no log behind.
+LOG_PATH = Path.home() / ".boxtime" / "debug.log"
+
 config = {
     "handlers": [
         {
-            "sink": "debug.log",
+            "sink": LOG_PATH,
             "serialize": True,
             "level": "DEBUG",
             "format": "{time}|{name}:{line}|{function}| {message}",
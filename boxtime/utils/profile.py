@@ -0,0 +1,225 @@
+"""
+Timing spans and counters for the hot paths, written to the `~/.boxtime/debug.log` sink
+of `boxtime.utils.logger`.
+
+Profiling is off unless the `BOXTIME_PROFILE` environment variable is set to anything but `0`.
+Switched off, `span` hands out one shared no-op and `timed` returns the function it decorates
+unchanged, so instrumented code runs as if it wasn't.
+
+```shell
+BOXTIME_PROFILE=1 python report.py
+boxtime profile --last
+```
+
+Every span is logged when it closes, with its duration in seconds. Counters are summed in
+memory and logged once, when the process exits. Records of one process share a `run` id,
+`summarize` reduces them into percentiles per operation.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+import numpy as np
+
+from boxtime.utils.logger import LOG_PATH, logger
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENABLED = os.environ.get("BOXTIME_PROFILE", "0") not in ("", "0")
+RUN = f"{os.getpid()}-{time.time_ns()}"
+
+profile_logger = logger.bind(profile=True, run=RUN)
+counters: Counter = Counter()
+counters_lock = threading.Lock()
+
+
+class Span:
+    """
+    Times the block it wraps. `set` adds fields known only inside the block, like sizes.
+    """
+
+    __slots__ = ("name", "fields", "start")
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = fields
+        self.start = 0.0
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        seconds = time.perf_counter() - self.start
+        profile_logger.bind(
+            kind="span",
+            span=self.name,
+            seconds=seconds,
+            failed=exc_type is not None,
+            **self.fields,
+        ).debug(f"{self.name} took {seconds * 1000:.3f}ms")
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def set(self, **fields: Any) -> None:
+        pass
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+def span(name: str, detail: str | None = None, **fields: Any) -> Span | NullSpan:
+    """
+    A span timing one `name` operation. Spans with a `detail`, like the statement of a
+    query, are summarized separately from other spans of the same name.
+    """
+    if not ENABLED:
+        return NULL_SPAN
+    if detail is not None:
+        fields["detail"] = detail
+    return Span(name, fields)
+
+
+def timed(name: str, detail: str | None = None) -> Callable[[F], F]:
+    """
+    Decorate a function to run in a span. Without profiling the function is left as is.
+    """
+
+    def decorate(fn: F) -> F:
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, detail):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name: str, n: int = 1) -> None:
+    if not ENABLED:
+        return
+    with counters_lock:
+        counters[name] += n
+
+
+def flush_counters() -> None:
+    with counters_lock:
+        totals = dict(counters)
+        counters.clear()
+    for name, value in sorted(totals.items()):
+        profile_logger.bind(kind="counter", counter=name, value=value).debug(
+            f"{name}: {value}"
+        )
+
+
+if ENABLED:
+    atexit.register(flush_counters)
+
+
+def records(path: Path = LOG_PATH) -> Iterator[Dict[str, Any]]:
+    """
+    `extra` of every profiling record in the serialized log at `path`, none if it doesn't
+    exist yet.
+    """
+    if not path.exists():
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                extra = json.loads(line)["record"]["extra"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            if extra.get("profile"):
+                yield extra
+
+
+SpanRow = Tuple[str, int, float, float, float, float]
+
+
+def summarize(
+    path: Path = LOG_PATH, last: bool = False
+) -> Tuple[List[SpanRow], Dict[str, int]]:
+    """
+    Percentiles of span durations per operation, and counter totals.
+
+    Args:
+        path (Path, optional): Serialized log to read. Defaults to
+            `~/.boxtime/debug.log`.
+        last (bool, optional): Only the last profiled run. Defaults to every run in the log.
+
+    Returns:
+        Tuple[List[SpanRow], Dict[str, int]]: `(operation, calls, total, p50, p95, max)` per
+            operation, in seconds, slowest total first. And the total of each counter.
+    """
+    extras = list(records(path))
+    if last and extras:
+        run = extras[-1]["run"]
+        extras = [extra for extra in extras if extra["run"] == run]
+
+    durations: Dict[str, List[float]] = defaultdict(list)
+    totals: Counter = Counter()
+    for extra in extras:
+        if extra.get("kind") == "span":
+            name = extra["span"]
+            if "detail" in extra:
+                name = f"{name} {extra['detail']}"
+            durations[name].append(extra["seconds"])
+        elif extra.get("kind") == "counter":
+            totals[extra["counter"]] += extra["value"]
+
+    rows = []
+    for name, seconds in durations.items():
+        seconds = np.array(seconds)
+        p50, p95 = np.percentile(seconds, [50, 95])
+        rows.append((name, len(seconds), seconds.sum(), p50, p95, seconds.max()))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows, dict(totals)
+
+
+def report(path: Path = LOG_PATH, last: bool = False, limit: int | None = None) -> str:
+    """
+    `summarize` as text tables, durations in milliseconds.
+    """
+    rows, totals = summarize(path, last)
+    if not rows and not totals:
+        return f"No profiling records in {path}, run with BOXTIME_PROFILE=1."
+
+    rows = rows[:limit] if limit else rows
+    width = max([len("operation")] + [len(row[0]) for row in rows])
+    lines = [
+        f"{'operation':<{width}}  {'calls':>8}  {'total ms':>10}  {'p50 ms':>9}"
+        f"  {'p95 ms':>9}  {'max ms':>9}"
+    ]
+    for name, calls, total, p50, p95, max_ in rows:
+        lines.append(
+            f"{name:<{width}}  {calls:>8}  {total * 1000:>10.1f}  {p50 * 1000:>9.3f}"
+            f"  {p95 * 1000:>9.3f}  {max_ * 1000:>9.3f}"
+        )
+    if totals:
+        width = max(len("counter"), *(len(name) for name in totals))
+        lines += ["", f"{'counter':<{width}}  {'total':>12}"]
+        for name, value in sorted(totals.items()):
+            lines.append(f"{name:<{width}}  {value:>12}")
+    return "\n".join(lines)
@@ -1,16 +1,21 @@
-from typing import List, Dict
+from typing import Dict, Iterable, List, Tuple
 from collections import defaultdict
-from enum import Enum
 
-from boxtime.vendor.calendar import Event
+import numpy as np
 
+from boxtime.db.aggregation import AXIS_SIZE, AggregateBy, Aggregation, axis_labels
+from boxtime.utils import profile
+from boxtime.vendor.calendar import Event
+from boxtime.vendor.frame import (
+    SECONDS_IN_A_DAY,
+    EventFrame,
+    day_of_week,
+    iso_week,
+    local_days,
+)
+from boxtime.vis.colors import Color
 
-class AggregateBy(Enum):
-    DAY = "day"
-    DAY_OF_WEEK = "day_of_week"
-    WEEK = "week"
-    MONTH = "month"
-    TAG = "tag"
+SECONDS_IN_AN_HOUR = 3600
 
 
 def key_by(event: Event, field: AggregateBy) -> int:
@@ -23,15 +28,18 @@ def key_by(event: Event, field: AggregateBy) -> int:
     Returns:
         str: Key to group events by
     """
+    if field == AggregateBy.TAG:
+        return event.tag
     dt = event.start.dt
-    keys = {
-        AggregateBy.DAY: dt.day - 1,
-        AggregateBy.WEEK: dt.isocalendar().week - 1,
-        AggregateBy.MONTH: dt.month - 1,
-        AggregateBy.DAY_OF_WEEK: dt.isoweekday() - 1,
-        AggregateBy.TAG: event.tag,
-    }
-    return keys[field]
+    if field == AggregateBy.HOUR:
+        return dt.hour
+    if field == AggregateBy.DAY:
+        return dt.day - 1
+    if field == AggregateBy.WEEK:
+        return dt.isocalendar().week - 1
+    if field == AggregateBy.MONTH:
+        return dt.month - 1
+    return dt.isoweekday() - 1
 
 
 GroupedEvents = Dict[str | int, List[Event] | Dict[str | int, List[Event]]]
@@ -61,16 +69,112 @@ def group_by(
     return events
 
 
-def agg_by(events: List[Event], *fields: AggregateBy) -> Dict[str, Dict[int, float]]:
-    inner, outer = fields
-    grouped_events: GroupedEvents = group_by(group_by(events, inner), outer)
-    events_agg_by_duration = defaultdict(lambda: defaultdict(float))
+def as_frame(events: List[Event] | EventFrame) -> EventFrame:
+    """
+    Columnar view of `events`, tagged with the tags set on `Event`.
+    """
+    if isinstance(events, EventFrame):
+        return events
+    tags = {Color(color_id): tag for color_id, tag in Event.tags.items()}
+    return EventFrame.from_items(events, tags)
+
+
+def bucket_codes(
+    frame: EventFrame, *fields: AggregateBy
+) -> Dict[AggregateBy, np.ndarray]:
+    """
+    0-based bucket of every event for each of `fields`, matching `key_by`.
+
+    Calendar fields are computed from the local day of the event's start, shared across
+    fields.
+    """
+    days = local_days(frame)
+    dates = days.astype("datetime64[D]")
+    codes = {}
+    for field in fields:
+        if field == AggregateBy.HOUR:
+            local = frame.start + frame.offset
+            codes[field] = local % SECONDS_IN_A_DAY // SECONDS_IN_AN_HOUR
+        elif field == AggregateBy.DAY:
+            codes[field] = (dates - dates.astype("datetime64[M]")).astype(np.int64)
+        elif field == AggregateBy.DAY_OF_WEEK:
+            codes[field] = day_of_week(days)
+        elif field == AggregateBy.MONTH:
+            codes[field] = dates.astype("datetime64[M]").astype(np.int64) % 12
+        elif field == AggregateBy.WEEK:
+            codes[field] = iso_week(days)
+        elif field == AggregateBy.TAG:
+            codes[field] = frame.color.astype(np.int64)
+        else:
+            raise ValueError(f"Events can't be aggregated by {field.value}.")
+    return codes
+
+
+@profile.timed("aggregate.agg_by")
+def agg_by(events: List[Event] | EventFrame, *fields: AggregateBy) -> Aggregation:
+    """
+    Sum event durations over every combination of `fields`.
+
+    Args:
+        events (List[Event] | EventFrame): Events to aggregate.
+        fields (AggregateBy): One axis of the result per field, in order.
+
+    Returns:
+        Aggregation: Dense durations and event counts.
+    """
+    frame = as_frame(events)
+    codes = bucket_codes(frame, *fields)
+    shape = tuple(AXIS_SIZE[field] for field in fields)
+    size = int(np.prod(shape))
+    flat = np.ravel_multi_index([codes[field] for field in fields], shape)
+    values = np.bincount(flat, weights=frame.duration, minlength=size)
+    counts = np.bincount(flat, minlength=size)
+    return Aggregation(
+        values=values.reshape(shape),
+        counts=counts.reshape(shape),
+        fields=fields,
+        labels=tuple(axis_labels(frame.tags, field) for field in fields),
+    )
+
+
+def agg_stream(
+    chunks: Iterable[List[Event] | EventFrame], *fields: AggregateBy
+) -> Aggregation:
+    """
+    `agg_by` over a stream of event chunks, such as `EventService.stream`.
 
-    for tag, grouped_ in grouped_events.items():
-        for week, events in grouped_.items():
-            duration = 0
-            for event in events:
-                duration += event.duration
-            events_agg_by_duration[tag][week] = duration
+    Every chunk is reduced into the fixed-size arrays of an `Aggregation` and summed into a
+    running total, so only one chunk is held in memory at a time.
+    """
+    total = None
+    for chunk in chunks:
+        part = agg_by(chunk, *fields)
+        if total is None:
+            total = part
+        else:
+            total.values += part.values
+            total.counts += part.counts
+    if total is None:
+        return agg_by(as_frame([]), *fields)
+    return total
+
+
+def daily_hours(
+    chunks: Iterable[List[Event] | EventFrame],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Total hours of events per local day over a stream of event chunks.
 
-    return events_agg_by_duration
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Days with events, as days since the unix epoch, and
+            their hours. Memory grows with the number of days, not events.
+    """
+    days = np.empty(0, dtype=np.int64)
+    hours = np.empty(0, dtype=np.float64)
+    for chunk in chunks:
+        frame = as_frame(chunk)
+        days = np.concatenate([days, local_days(frame)])
+        hours = np.concatenate([hours, frame.duration])
+        days, inverse = np.unique(days, return_inverse=True)
+        hours = np.bincount(inverse, weights=hours, minlength=len(days))
+    return days, hours
@@ -0,0 +1,109 @@
+import os
+import sys
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from boxtime.vendor.calendar import Event
+from boxtime.vendor.frame import EventFrame
+from boxtime.vis.aggregate import Aggregation, as_frame
+from boxtime.vis.heatmap import plot_heatmap
+from boxtime.vis.radar import plot_radar
+from boxtime.vis.violin import plot_violin
+
+
+class PlotKind(Enum):
+    HEATMAP = "heatmap"
+    RADAR = "radar"
+    VIOLIN = "violin"
+
+
+class RenderJob(NamedTuple):
+    """
+    One chart to render.
+
+    `options` are passed on to the plot function, e.g. `tags` for radar and violin plots and
+    `period` for violin plots. Radar and violin plots may also be drawn from an `Aggregation`.
+    """
+
+    kind: PlotKind
+    events: List[Event] | EventFrame | Aggregation
+    save_key: str
+    options: Dict[str, Any] | None = None
+
+
+PLOTTERS = {
+    PlotKind.HEATMAP: plot_heatmap,
+    PlotKind.RADAR: plot_radar,
+    PlotKind.VIOLIN: plot_violin,
+}
+
+
+def init_worker() -> None:
+    matplotlib.use("Agg")
+
+
+def shippable(job: RenderJob) -> RenderJob:
+    """
+    `job` with its events as `EventFrame` columns, `Aggregation`s are sent as they are.
+    """
+    if not isinstance(job.events, Aggregation):
+        return job._replace(events=as_frame(job.events).without_source())
+    if job.kind == PlotKind.HEATMAP:
+        raise TypeError("Heatmaps are plotted from events, not an Aggregation.")
+    return job
+
+
+def render(job: RenderJob) -> Path:
+    """
+    Render and save a single job, then release its figure. Charts whose data didn't change
+    are served by the render cache without drawing.
+    """
+    options = job.options or {}
+    fig = PLOTTERS[job.kind](job.events, save_key=job.save_key, **options)
+    if fig is not None:
+        plt.close(fig)
+    return Path("assets", job.save_key, f"{job.kind.value}.png")
+
+
+def render_batch(
+    jobs: List[RenderJob],
+    max_workers: int | None = None,
+    jobs_per_worker: int = 32,
+) -> List[Path]:
+    """
+    Render many charts across a pool of processes on the non-interactive Agg backend.
+
+    Events are shipped to workers as `EventFrame` columns, aggregations as they are. Every
+    figure is closed as soon as it is saved, and workers are replaced after `jobs_per_worker`
+    jobs (python 3.11+) so that memory held by matplotlib caches stays bounded. Heatmaps
+    can't be drawn from an `Aggregation`, such jobs raise `TypeError` before any is rendered.
+
+    Args:
+        jobs (List[RenderJob]): Charts to render.
+        max_workers (int | None, optional): Number of processes. Defaults to the CPU count.
+        jobs_per_worker (int, optional): Jobs a worker renders before it is replaced.
+            Defaults to 32.
+
+    Returns:
+        List[Path]: Path of every saved chart, in the order of `jobs`.
+    """
+    jobs = [shippable(job) for job in jobs]
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(jobs), 1))
+    pool_options: Dict[str, Any] = {}
+    if sys.version_info >= (3, 11):
+        pool_options["max_tasks_per_child"] = jobs_per_worker
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context("spawn"),
+        initializer=init_worker,
+        **pool_options,
+    ) as pool:
+        chunksize = max(1, min(jobs_per_worker, len(jobs) // (max_workers * 4)))
+        return list(pool.map(render, jobs, chunksize=chunksize))
@@ -0,0 +1,76 @@
+from typing import Tuple
+
+import numpy as np
+
+from boxtime.vendor.frame import day_of_week
+
+N_ROWS = 7
+N_COLS = 54
+
+
+class CalendarIndex:
+    """
+    Position of every day of a range of years in a stack of calendar grids.
+
+    Each year is a panel of 7 rows (Monday first) by 54 columns. Column `c` holds the `c`-th
+    Monday-to-Sunday week of the year, the first and last columns are partial weeks, so every
+    day has its own cell and years never share cells.
+
+    The index is built once as NumPy arrays over all days, `day` values elsewhere are days
+    since the unix epoch.
+    """
+
+    def __init__(self, first_year: int, last_year: int):
+        self.first_year = first_year
+        self.years = np.arange(first_year, last_year + 1)
+        start = np.datetime64(f"{first_year}-01-01", "D")
+        end = np.datetime64(f"{last_year + 1}-01-01", "D")
+        dates = np.arange(start, end, dtype="datetime64[D]")
+        new_years = dates.astype("datetime64[Y]").astype("datetime64[D]")
+
+        self.first_day = int(start.astype(np.int64))
+        self.panel = dates.astype("datetime64[Y]").astype(np.int64) - (
+            first_year - 1970
+        )
+        self.row = day_of_week(dates)
+        new_year_row = day_of_week(new_years)
+        self.col = ((dates - new_years).astype(np.int64) + new_year_row) // 7
+        self.flat = np.ravel_multi_index((self.panel, self.row, self.col), self.shape)
+
+    @classmethod
+    def spanning(cls, days: np.ndarray) -> "CalendarIndex":
+        """
+        Index over the whole years that contain `days`.
+        """
+        if len(days) == 0:
+            days = np.array([np.datetime64("today", "D").astype(np.int64)])
+        years = days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+        return cls(int(years.min()) + 1970, int(years.max()) + 1970)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (len(self.years), N_ROWS, N_COLS)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """
+        Mask of grid cells that correspond to a date.
+        """
+        mask = np.zeros(self.shape, dtype=bool)
+        mask.flat[self.flat] = True
+        return mask
+
+    def scatter(self, days: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Sum `values` into the cells of their `days`.
+
+        Days outside the indexed years are dropped.
+        """
+        position = days - self.first_day
+        inside = (position >= 0) & (position < len(self.flat))
+        grid = np.bincount(
+            self.flat[position[inside]],
+            weights=values[inside],
+            minlength=int(np.prod(self.shape)),
+        )
+        return grid.reshape(self.shape)
@@ -1,20 +1,4 @@
-from enum import Enum
-from typing import Tuple
-
-
-class Color(Enum):
-    LAVENDER = "1"
-    SAGE = "2"
-    GRAPE = "3"
-    FLAMINGO = "4"
-    BANANA = "5"
-    TANGERINE = "6"
-    PEACOCK = "7"
-    GRAPHITE = "8"
-    BLUEBERRY = "9"
-    BASIL = "10"
-    TOMATO = "11"
-    UNASSIGNED = "12"
+from boxtime.vendor.colors import Color
 
 
 color_map = {
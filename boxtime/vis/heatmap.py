@@ -3,11 +3,15 @@ from typing import List
 import numpy as np
 from seaborn import heatmap
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.colors import LinearSegmentedColormap
 
 from boxtime.vendor.calendar import Event
-from boxtime.vis.aggregate import agg_by, AggregateBy
-from boxtime.vis.utils import save_plot
+from boxtime.vendor.frame import EventFrame
+from boxtime.utils import profile
+from boxtime.vis.aggregate import as_frame, local_days
+from boxtime.vis.calendar_index import CalendarIndex
+from boxtime.vis.utils import cached_plot, render_key, save_plot
 
 
 def make_cmap(cmap: dict[str, int]) -> LinearSegmentedColormap:
@@ -18,19 +22,8 @@ def make_cmap(cmap: dict[str, int]) -> LinearSegmentedColormap:
     return cmap_
 
 
-def plot_heatmap(events: List[Event], save_key: str | None = None):
-    """
-    Plot a heatmap of the events
-    """
-    n_rows = 7
-    n_cols = 52
-    data = np.zeros((n_rows, n_cols))
-    events_agg_by_duration = agg_by(events, AggregateBy.DAY_OF_WEEK, AggregateBy.WEEK)
-
-    for day, grouped_ in events_agg_by_duration.items():
-        for week, duration in grouped_.items():
-            data[day][week] = duration
-
+@profile.timed("plot.build", "heatmap")
+def draw_heatmap(index: CalendarIndex, data: np.ndarray, mask: np.ndarray) -> Figure:
     cmap = make_cmap(
         {"#fff5f1": 0, "#fee4b1": 4, "green": 8, "#fe8888": 10, "#fe4848": 15}
     )
@@ -45,26 +38,67 @@ def plot_heatmap(events: List[Event], save_key: str | None = None):
         6: "Sunday",
     }
 
-    plt.figure(figsize=(20, 5), dpi=300)
-    ax = heatmap(
-        data,
-        square=True,
-        annot=True,
-        fmt=".0f",
-        cbar=False,
-        cbar_kws={"shrink": 0.4},
-        vmax=15,
-        linewidths=1,
-        linecolor="#ffffff",
-        cmap=cmap,
-        yticklabels=days_of_week.values(),
+    n_panels = len(index.years)
+    fig, axes = plt.subplots(
+        n_panels, 1, figsize=(20, 5 * n_panels), dpi=300, squeeze=False
     )
-    ax.set_title(
-        "Quality of time spent.",
-        fontsize=16,
-    )
-    ax.set_xlabel("Weeks", fontsize=14)
-    ax.set_ylabel("Days", fontsize=14)
+    for ax, year, panel, panel_mask in zip(axes[:, 0], index.years, data, mask):
+        heatmap(
+            panel,
+            mask=panel_mask,
+            ax=ax,
+            square=True,
+            annot=True,
+            fmt=".0f",
+            cbar=False,
+            cbar_kws={"shrink": 0.4},
+            vmin=0,
+            vmax=15,
+            linewidths=1,
+            linecolor="#ffffff",
+            cmap=cmap,
+            yticklabels=days_of_week.values(),
+        )
+        ax.set_title(f"{year}", fontsize=14)
+        ax.set_xlabel("Weeks", fontsize=14)
+        ax.set_ylabel("Days", fontsize=14)
+    fig.suptitle("Quality of time spent.", fontsize=16)
+    return fig
+
+
+def plot_heatmap(
+    events: List[Event] | EventFrame, save_key: str | None = None
+) -> Figure | None:
+    """
+    Plot a heatmap of the events, one calendar panel per year.
+
+    Returns None without drawing when the chart saved under `save_key` was rendered from the
+    same data.
+    """
+    frame = as_frame(events)
+    return plot_daily_heatmap(local_days(frame), frame.duration, save_key)
+
+
+def plot_daily_heatmap(
+    days: np.ndarray, hours: np.ndarray, save_key: str | None = None
+) -> Figure | None:
+    """
+    Plot hours spent per day as stacked yearly calendar panels.
+
+    Args:
+        days (np.ndarray): Days since the unix epoch, may repeat.
+        hours (np.ndarray): Hours spent on each entry of `days`.
+        save_key (str | None, optional): Save the chart under `assets/<save_key>/`.
+    """
+    index = CalendarIndex.spanning(days)
+    data = index.scatter(days, hours)
+    mask = ~index.valid
+    key = render_key("heatmap", data, index.years)
+    if cached_plot(save_key, "heatmap.png", key):
+        return None
+
+    fig = draw_heatmap(index, data, mask)
 
     if save_key:
-        save_plot(save_key, "heatmap.png")
+        save_plot(save_key, "heatmap.png", fig, key)
+    return fig
@@ -0,0 +1,220 @@
+"""
+Overlap joins between calendar events and emotion logs.
+
+An event and a log coincide when the event's `[start, end)` and the log's `[timestamp,
+timestamp + duration)` intersect. Pairs are found by a sweep over the sorted endpoints of both,
+in O((n + m) log(n + m) + k) for n events, m logs and k coinciding pairs, and reduced into
+co-occurrence tables of the time each tag or attendee spent alongside each feeling.
+
+```python
+frame = EventService.list(start, end, tags, as_frame=True)
+logs = LogIntervals.load(start=start, end=end)
+tag_feelings(frame, logs).values  # Hours, tags x feelings.
+```
+"""
+
+from itertools import repeat
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from boxtime.db.schema import EmotionLog, log_axis_labels
+from boxtime.utils.epoch import to_epoch
+from boxtime.vendor.calendar import Event
+from boxtime.vendor.colors import tag_names
+from boxtime.vendor.frame import EventFrame, intern
+from boxtime.vis.aggregate import (
+    AXIS_SIZE,
+    SECONDS_IN_AN_HOUR,
+    AggregateBy,
+    Aggregation,
+)
+
+END, START = 0, 1
+
+
+class LogIntervals:
+    """
+    Columnar emotion logs, sorted by start.
+
+    - `id`: id of the log.
+    - `start`, `end`: epoch seconds (int64).
+    - `feeling`: `Feeling` value of the log.
+    """
+
+    def __init__(
+        self, id: np.ndarray, start: np.ndarray, end: np.ndarray, feeling: np.ndarray
+    ):
+        self.id = id
+        self.start = start
+        self.end = end
+        self.feeling = feeling
+
+    @classmethod
+    def load(cls, **filters) -> "LogIntervals":
+        """
+        Logs read straight from the database, `filters` as `EmotionLog.intervals`.
+        """
+        return cls(*EmotionLog.intervals(**filters))
+
+    @classmethod
+    def from_logs(cls, logs: Sequence[EmotionLog]) -> "LogIntervals":
+        id_ = np.array([log.id for log in logs], dtype=np.int64)
+        start = np.array([to_epoch(log.timestamp) for log in logs], dtype=np.int64)
+        duration = np.array([log.duration * 60 for log in logs], dtype=np.int64)
+        feeling = np.array([log.feeling.value for log in logs], dtype=np.int64)
+        order = np.argsort(start, kind="stable")
+        return cls(
+            id=id_[order],
+            start=start[order],
+            end=(start + duration)[order],
+            feeling=feeling[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+def overlapping(
+    a_start: np.ndarray, a_end: np.ndarray, b_start: np.ndarray, b_end: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every pair `(i, j)` of intervals `[a_start[i], a_end[i])` and `[b_start[j], b_end[j])`
+    that intersect.
+
+    Endpoints of both sides are sorted together and swept in order, keeping the intervals
+    of each side that are open. An interval is paired with the open intervals of the other
+    side when it starts, so every pair is found once, by the later of the two. Intervals that
+    only touch don't overlap, and empty intervals overlap nothing.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indexes into `a` and `b` of the overlapping pairs.
+    """
+    a = np.flatnonzero(a_end > a_start)
+    b = np.flatnonzero(b_end > b_start)
+    times = np.concatenate([a_start[a], a_end[a], b_start[b], b_end[b]])
+    kinds = np.repeat([START, END, START, END], [len(a), len(a), len(b), len(b)])
+    sides = np.repeat([0, 1], [2 * len(a), 2 * len(b)])
+    index = np.concatenate([a, a, b, b])
+    # Ends sort before starts at the same time.
+    order = np.lexsort((kinds, times))
+
+    opened: Tuple[dict, dict] = ({}, {})
+    pairs: Tuple[List[int], List[int]] = ([], [])
+    for kind, side, i in zip(
+        kinds[order].tolist(), sides[order].tolist(), index[order].tolist()
+    ):
+        if kind == END:
+            del opened[side][i]
+            continue
+        other = opened[1 - side]
+        if other:
+            pairs[side].extend(repeat(i, len(other)))
+            pairs[1 - side].extend(other)
+        opened[side][i] = None
+    return np.array(pairs[0], dtype=np.int64), np.array(pairs[1], dtype=np.int64)
+
+
+def overlaps(
+    frame: EventFrame, logs: LogIntervals
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Events and logs that coincide.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Rows of `frame` and `logs` of every
+            coinciding pair, and the seconds they overlap.
+    """
+    events, log_rows = overlapping(frame.start, frame.end, logs.start, logs.end)
+    seconds = np.minimum(frame.end[events], logs.end[log_rows]) - np.maximum(
+        frame.start[events], logs.start[log_rows]
+    )
+    return events, log_rows, seconds
+
+
+def co_occurrence(
+    keys: np.ndarray,
+    feelings: np.ndarray,
+    seconds: np.ndarray,
+    field: AggregateBy,
+    labels: np.ndarray,
+) -> Aggregation:
+    shape = (len(labels), AXIS_SIZE[AggregateBy.FEELING])
+    size = int(np.prod(shape))
+    flat = np.ravel_multi_index((keys, feelings), shape)
+    values = np.bincount(flat, weights=seconds / SECONDS_IN_AN_HOUR, minlength=size)
+    counts = np.bincount(flat, minlength=size)
+    return Aggregation(
+        values=values.reshape(shape),
+        counts=counts.reshape(shape),
+        fields=(field, AggregateBy.FEELING),
+        labels=(labels, log_axis_labels(AggregateBy.FEELING)),
+    )
+
+
+def tag_feelings(frame: EventFrame, logs: LogIntervals) -> Aggregation:
+    """
+    Hours each tag's events overlapped logs of each feeling.
+
+    Returns:
+        Aggregation: By `TAG` and `FEELING`, `counts` has the number of coinciding event and
+            log pairs.
+    """
+    events, log_rows, seconds = overlaps(frame, logs)
+    return co_occurrence(
+        frame.color[events].astype(np.int64),
+        logs.feeling[log_rows],
+        seconds,
+        AggregateBy.TAG,
+        tag_names(frame.tags),
+    )
+
+
+def attendee_emails(frame: EventFrame, rows: np.ndarray) -> List[List[str]]:
+    """
+    Emails of the attendees of `rows` of `frame`, leaving out the calendar's owner.
+    """
+    if len(frame) and not len(frame.source):
+        raise ValueError("Attendees need the frame's source events.")
+    emails = []
+    for row in frame.row[rows].tolist():
+        item = frame.source[row]
+        if isinstance(item, Event):
+            people = [(user.email, user.self) for user in item.attendees]
+        else:
+            people = [
+                (user["email"], user.get("self")) for user in item.get("attendees", ())
+            ]
+        emails.append([email for email, is_self in people if not is_self])
+    return emails
+
+
+def attendee_feelings(frame: EventFrame, logs: LogIntervals) -> Aggregation:
+    """
+    Hours spent with each attendee that overlapped logs of each feeling.
+
+    Attendees are only read for the events that overlap a log.
+
+    Returns:
+        Aggregation: By `ATTENDEE` and `FEELING`, labelled with attendee emails. `counts` has
+            the number of coinciding event and log pairs the attendee was invited to.
+    """
+    events, log_rows, seconds = overlaps(frame, logs)
+    unique, position = np.unique(events, return_inverse=True)
+    emails = attendee_emails(frame, unique)
+    sizes = np.array([len(row) for row in emails], dtype=np.int64)
+    codes, vocab = intern([email for row in emails for email in row])
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    # One entry per attendee of every pair.
+    per_pair = sizes[position]
+    pair = np.repeat(np.arange(len(events)), per_pair)
+    first = np.repeat(offsets[position] - (np.cumsum(per_pair) - per_pair), per_pair)
+    attendee = codes[first + np.arange(len(pair))].astype(np.int64)
+    return co_occurrence(
+        attendee,
+        logs.feeling[log_rows][pair],
+        seconds[pair],
+        AggregateBy.ATTENDEE,
+        vocab,
+    )
@@ -2,32 +2,18 @@ from typing import Dict, List
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 from boxtime.vendor.calendar import Event
-from boxtime.vis.aggregate import group_by, AggregateBy
+from boxtime.vendor.frame import EventFrame
+from boxtime.utils import profile
+from boxtime.vis.aggregate import agg_by, AggregateBy, Aggregation
 from boxtime.vis.colors import Color
-from boxtime.vis.utils import save_plot
+from boxtime.vis.utils import cached_plot, render_key, save_plot
 
 
-def plot_radar(
-    events: List[Event],
-    tags: Dict[Color, str],
-    save_key: str | None = None,
-):
-    events_agg_by_duration_tags = group_by(
-        events,
-        AggregateBy.TAG,
-    )
-    reverese_tags = {v: k for k, v in tags.items()}
-    data = {}
-
-    for tag, t_events in events_agg_by_duration_tags.items():
-        if tag not in reverese_tags:
-            continue
-        data[tag] = sum([e.duration for e in t_events])
-
-    values = list(data.values())
-
+@profile.timed("plot.build", "radar")
+def draw_radar(data: Dict[str, float], values: List[float]) -> Figure:
     theta = np.arange(len(values) + 1) / len(values) * 2 * np.pi
     values_ = np.array(values + [values[0]])
 
@@ -39,6 +25,43 @@ def plot_radar(
 
     ax.fill(theta, values_, "green", alpha=0.1)
     plt.title("(Un)Balanced time investment.")
+    return fig
+
+
+def plot_radar(
+    events: List[Event] | EventFrame | Aggregation,
+    tags: Dict[Color, str],
+    save_key: str | None = None,
+) -> Figure | None:
+    """
+    Plot the hours spent on each tag around a circle.
+
+    `events` may also be an `Aggregation` by `AggregateBy.TAG`, such as one answered from the
+    database rollups, or by any other single field, like `EmotionLog.stats` by `FEELING`;
+    `tags` only filters the tag axis. Returns None without drawing when the chart saved under
+    `save_key` was rendered from the same data.
+    """
+    if isinstance(events, Aggregation):
+        aggregation = events
+    else:
+        aggregation = agg_by(events, AggregateBy.TAG)
+    by_tag = aggregation.fields[0] == AggregateBy.TAG
+    present = aggregation.present(0)
+    data = {
+        tag: duration
+        for tag, duration, has_events in zip(
+            aggregation.labels[0], aggregation.values, present
+        )
+        if has_events and (tag in tags.values() or not by_tag)
+    }
+
+    values = list(data.values())
+    key = render_key("radar", list(data), values)
+    if cached_plot(save_key, "radar.png", key):
+        return None
+
+    fig = draw_radar(data, values)
 
     if save_key:
-        save_plot(save_key, "radar.png")
+        save_plot(save_key, "radar.png", fig, key)
+    return fig
@@ -1,11 +1,168 @@
+import hashlib
+import os
+import shutil
 from pathlib import Path
+from typing import Any
+
+import numpy as np
+import matplotlib
+from matplotlib import font_manager
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import seaborn
+
+from boxtime.utils import profile
 
 
-def save_plot(save_key: str, filename: str):
-    par = Path("assets", save_key)
-    par.mkdir(parents=True, exist_ok=True)
-    path = par / filename
-    if path.exists():
+def use_custom_font(path: Path = Path.home() / ".fonts/Roboto-Light.ttf"):
+    """
+    Switch plots to the Roboto font when it is installed.
+
+    This lives here rather than in `boxtime.vis` so that importing the aggregation code
+    doesn't pay for loading matplotlib.
+    """
+    if not path.exists():
         return
-    plt.savefig(path, bbox_inches="tight")
+    fp = font_manager.FontProperties(fname=path)
+    font_manager.findfont(fp)
+    custom_font = fp.get_name()
+
+    if custom_font == "Roboto":
+        plt.rcParams["font.family"] = custom_font
+
+
+use_custom_font()
+
+
+RENDER_CACHE_VERSION = "1"
+
+
+def render_key(kind: str, *arrays: Any, **params: Any) -> str:
+    """
+    Content hash of everything a chart is drawn from.
+
+    Args:
+        kind (str): Name of the chart.
+        arrays (Any): The aggregated data, anything `np.asarray` accepts.
+        params (Any): Remaining plot parameters, hashed by their `repr`.
+    """
+    digest = hashlib.sha256()
+    # Heatmaps and violins are drawn by seaborn, on top of matplotlib.
+    versions = f"{RENDER_CACHE_VERSION}:{matplotlib.__version__}:{seaborn.__version__}"
+    digest.update(f"{kind}:{versions}".encode())
+    for array in arrays:
+        array = np.ascontiguousarray(np.asarray(array))
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        if array.dtype == object:
+            digest.update(repr(array.tolist()).encode())
+        else:
+            digest.update(array.tobytes())
+    digest.update(repr(sorted(params.items(), key=lambda kv: kv[0])).encode())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Rendered charts keyed by `render_key`.
+
+    Images live in `assets/.render_cache/<key>.png` and are copied to their
+    `assets/<save_key>/<filename>` destination. A `<filename>.key` file next to the
+    destination records which key it was rendered from. The store is trimmed to `max_bytes`
+    by evicting the least recently used images. All state is on the filesystem, so worker
+    processes of a batch render can share one cache.
+    """
+
+    def __init__(self, root: Path = Path("assets", ".render_cache"), max_bytes=2**28):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def image(self, key: str) -> Path:
+        return self.root / f"{key}.png"
+
+    @staticmethod
+    def key_file(path: Path) -> Path:
+        return path.with_name(f"{path.name}.key")
+
+    def restore(self, path: Path, key: str) -> bool:
+        """
+        Make `path` hold the image rendered for `key` if the cache has it.
+
+        Returns:
+            bool: False if the chart has to be rendered.
+        """
+        key_file = self.key_file(path)
+        image = self.image(key)
+        if path.exists() and key_file.exists() and key_file.read_text() == key:
+            if image.exists():
+                os.utime(image)
+            return True
+        if not image.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(image, path)
+        key_file.write_text(key)
+        os.utime(image)
+        return True
+
+    def store(self, path: Path, key: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.image(key).with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, self.image(key))
+        self.key_file(path).write_text(key)
+        self.evict()
+
+    def evict(self) -> None:
+        images = []
+        for image in self.root.glob("*.png"):
+            try:
+                stat = image.stat()
+            except FileNotFoundError:
+                continue
+            images.append((stat.st_mtime_ns, stat.st_size, image))
+        total = sum(size for _, size, _ in images)
+        for _, size, image in sorted(images, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            image.unlink(missing_ok=True)
+            total -= size
+
+
+render_cache = RenderCache()
+
+
+def plot_path(save_key: str, filename: str) -> Path:
+    return Path("assets", save_key, filename)
+
+
+def cached_plot(save_key: str | None, filename: str, key: str) -> bool:
+    """
+    True when the chart for `key` is already at its destination, so plotting can be skipped.
+    """
+    if not save_key:
+        return False
+    cached = render_cache.restore(plot_path(save_key, filename), key)
+    profile.count("plot.cached" if cached else "plot.rendered")
+    return cached
+
+
+def save_plot(
+    save_key: str,
+    filename: str,
+    fig: Figure | None = None,
+    key: str | None = None,
+) -> Path:
+    """
+    Save a chart to `assets/<save_key>/<filename>`, overwriting an older render.
+
+    Passing the chart's `render_key` stores it in the render cache as well.
+    """
+    path = plot_path(save_key, filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with profile.span("plot.save", filename):
+        (fig or plt).savefig(path, bbox_inches="tight")
+    if key:
+        render_cache.store(path, key)
+    else:
+        render_cache.key_file(path).unlink(missing_ok=True)
+    return path
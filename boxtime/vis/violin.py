@@ -4,33 +4,20 @@ import numpy as np
 import pandas as pd
 from seaborn import violinplot, color_palette
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
 
 from boxtime.vendor.calendar import Event
-from boxtime.vis.aggregate import agg_by, AggregateBy
+from boxtime.vendor.frame import EventFrame
+from boxtime.utils import profile
+from boxtime.vis.aggregate import agg_by, AggregateBy, Aggregation
 from boxtime.vis.colors import color_map, Color
-from boxtime.vis.utils import save_plot
+from boxtime.vis.utils import cached_plot, render_key, save_plot
 
 
-def plot_violin(
-    events: List[Event],
-    tags: Dict[Color, str],
-    period: AggregateBy,
-    save_key: str | None = None,
-):
-    """
-    Plot a violin plot of the events
-    """
-    events_agg_by_duration_tags = agg_by(
-        events,
-        AggregateBy.TAG,
-        period,
-    )
-    df = pd.DataFrame.from_dict(events_agg_by_duration_tags)
-    df.fillna(0, inplace=True)
-
+@profile.timed("plot.build", "violin")
+def draw_violin(df: pd.DataFrame, reverse_tags: Dict[str, Color]) -> Figure:
     # Set a color palette for the violin plots
-    reverse_tags = {v: k for k, v in tags.items()}
     hex_colors = [
         color_map[reverse_tags.get(col, Color.UNASSIGNED)] for col in df.columns
     ]
@@ -39,7 +26,7 @@ def plot_violin(
     df.rename(columns=columns, inplace=True)
 
     # Create the violin plot
-    plt.figure(figsize=(20, 12), dpi=300)
+    fig = plt.figure(figsize=(20, 12), dpi=300)
 
     ax = violinplot(
         data=df,
@@ -106,6 +93,42 @@ def plot_violin(
 
     # Add the legend to the plot
     plt.legend(handles=custom_legend, title="Legend", loc="upper right")
+    return fig
+
+
+def plot_violin(
+    events: List[Event] | EventFrame | Aggregation,
+    tags: Dict[Color, str],
+    period: AggregateBy,
+    save_key: str | None = None,
+) -> Figure | None:
+    """
+    Plot a violin plot of the events
+
+    Returns None without drawing when the chart saved under `save_key` was rendered from the
+    same data. `events` may also be an `Aggregation` by `AggregateBy.TAG` and `period`, such
+    as one answered from the database rollups.
+    """
+    if isinstance(events, Aggregation):
+        aggregation = events
+    else:
+        aggregation = agg_by(events, AggregateBy.TAG, period)
+    tag_labels, period_labels = aggregation.labels
+    tag_mask = aggregation.present(0) & pd.notna(tag_labels)
+    period_mask = aggregation.present(1)
+    df = pd.DataFrame(
+        aggregation.values[tag_mask][:, period_mask].T,
+        index=period_labels[period_mask],
+        columns=list(tag_labels[tag_mask]),
+    )
+    reverse_tags = {v: k for k, v in tags.items()}
+    colors_key = [reverse_tags.get(col, Color.UNASSIGNED).value for col in df.columns]
+    key = render_key("violin", df.values, df.index, df.columns, colors_key)
+    if cached_plot(save_key, "violin.png", key):
+        return None
+
+    fig = draw_violin(df, reverse_tags)
 
     if save_key:
-        save_plot(save_key, "violin.png")
+        save_plot(save_key, "violin.png", fig, key)
+    return fig
@@ -0,0 +1,150 @@
+"""
+Benchmarks of the fetch, parse, aggregate and render pipeline, and of the database models.
+
+```shell
+pytest tests/benchmarks --benchmark-only
+BOXTIME_BENCH_SCALES=1000,100000,1000000 pytest tests/benchmarks --benchmark-only
+pytest tests/benchmarks --benchmark-only --benchmark-autosave --benchmark-compare
+```
+
+A plain `pytest` leaves the benchmarks out, they only run when `tests/benchmarks` is named.
+`--benchmark-autosave` saves the run as JSON under `.benchmarks/`, `--benchmark-compare`
+compares against the previous saved run. Event counts default to 1k and 100k, 1M is opt-in
+through `BOXTIME_BENCH_SCALES`.
+
+Fixtures are synthetic and seeded, so the same scale always benchmarks the same events. The
+calendar API is replaced by an in-memory client and each test runs in its own directory with
+its own database.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import matplotlib
+import pytest
+
+matplotlib.use("Agg")
+
+from boxtime.vendor.calendar import EventService  # noqa: E402
+from boxtime.vendor.sync import RawEvent  # noqa: E402
+from boxtime.vis.colors import Color  # noqa: E402
+
+SCALES = [
+    int(scale)
+    for scale in os.environ.get("BOXTIME_BENCH_SCALES", "1000,100000").split(",")
+]
+SEED = 7
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TAGS = {
+    Color.LAVENDER: "deep work",
+    Color.SAGE: "meetings",
+    Color.GRAPE: "learning",
+    Color.FLAMINGO: "hiring",
+    Color.BANANA: "support",
+    Color.TANGERINE: "planning",
+    Color.PEACOCK: "reviews",
+    Color.GRAPHITE: "admin",
+    Color.BLUEBERRY: "1:1",
+    Color.BASIL: "exercise",
+    Color.TOMATO: "incidents",
+}
+TIME_ZONES = [
+    ("Asia/Kolkata", timedelta(hours=5, minutes=30)),
+    ("Europe/Berlin", timedelta(hours=1)),
+    ("America/New_York", timedelta(hours=-5)),
+]
+
+
+@lru_cache(maxsize=None)
+def synthetic_events(n: int, seed: int = SEED) -> List[RawEvent]:
+    """
+    `n` raw events, as returned by the calendar API, spread over `[START, END)`.
+    """
+    rng = random.Random(seed)
+    span = int((END - START).total_seconds() // 900)
+    events = []
+    for i in range(n):
+        time_zone, offset = rng.choice(TIME_ZONES)
+        tz = timezone(offset)
+        start = (START + timedelta(minutes=15 * rng.randrange(span))).astimezone(tz)
+        end = start + timedelta(minutes=15 * rng.randint(1, 12))
+        event = {
+            "id": f"event{i}",
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.example.com/event{i}",
+            "created": "2021-12-01T09:00:00.000Z",
+            "updated": "2021-12-01T09:00:00.000Z",
+            "summary": f"Event {i % 500}",
+            "start": {"dateTime": start.isoformat(), "timeZone": time_zone},
+            "end": {"dateTime": end.isoformat(), "timeZone": time_zone},
+        }
+        color = rng.randint(0, 11)
+        if color:
+            event["colorId"] = str(color)
+        events.append(event)
+    return events
+
+
+class FakeRequest:
+    def __init__(self, response: Dict[str, Any]):
+        self.response = response
+
+    def execute(self) -> Dict[str, Any]:
+        return self.response
+
+
+class FakeEvents:
+    """
+    `events()` of the calendar API over a list of raw events, paginated like the API.
+    """
+
+    def __init__(self, items: List[RawEvent]):
+        self.items = items
+
+    def list(
+        self, pageToken: str | None = None, maxResults: int = 250, **params: Any
+    ) -> FakeRequest:
+        offset = int(pageToken or 0)
+        page: Dict[str, Any] = {"items": self.items[offset : offset + maxResults]}
+        if offset + maxResults < len(self.items):
+            page["nextPageToken"] = str(offset + maxResults)
+        else:
+            page["nextSyncToken"] = "synced"
+        return FakeRequest(page)
+
+
+class FakeClient:
+    def __init__(self, items: List[RawEvent]):
+        self._events = FakeEvents(items)
+
+    def events(self) -> FakeEvents:
+        return self._events
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "n_events" in metafunc.fixturenames:
+        metafunc.parametrize("n_events", SCALES, ids=[f"{n}" for n in SCALES])
+
+
+@pytest.fixture
+def raw_events(n_events: int) -> List[RawEvent]:
+    return synthetic_events(n_events)
+
+
+@pytest.fixture
+def calendar(raw_events: List[RawEvent], monkeypatch: pytest.MonkeyPatch) -> FakeClient:
+    """
+    Serve `raw_events` in place of the calendar API.
+    """
+    client = FakeClient(raw_events)
+    monkeypatch.setattr(EventService, "client", client)
+    monkeypatch.setattr(EventService, "credentials", None)
+    monkeypatch.setattr(EventService, "credentials_factory", staticmethod(object))
+    monkeypatch.setattr(
+        EventService, "client_factory", staticmethod(lambda credentials: client)
+    )
+    return client
@@ -0,0 +1,174 @@
+import random
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.migrations import migrate
+from boxtime.db.schema import EmotionLog, Feeling, People, Skill, TaskType
+from boxtime.snapshot import Snapshot, export, import_
+from boxtime.vis.aggregate import AggregateBy
+
+from tests.benchmarks.conftest import END, SEED, START
+
+N_PEOPLE = 200
+N_TASKS = 50
+
+
+def people_rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {"username": f"user{i}", "team": f"team{i % 20}", "role": "engineer"}
+        for i in range(n)
+    ]
+
+
+def task_rows(n: int) -> List[Dict[str, Any]]:
+    skills = list(Skill)
+    return [
+        {"name": f"task{i}", "skill": skills[i % len(skills)], "experience": i / n}
+        for i in range(n)
+    ]
+
+
+def log_rows(n: int, people: List[int], tasks: List[int]) -> List[Dict[str, Any]]:
+    rng = random.Random(SEED)
+    feelings = list(Feeling)
+    span = int((END - START).total_seconds())
+    return [
+        {
+            "feeling": rng.choice(feelings),
+            "timestamp": START + timedelta(seconds=rng.randrange(span)),
+            "duration": rng.randint(1, 120),
+            "trigger": f"trigger {i}",
+            "reaction": f"reaction {i}",
+            "people_id": rng.sample(people, 2),
+            "task_id": rng.sample(tasks, 1),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def populated(database, n_events: int) -> int:
+    people = People.insert_many(people_rows(N_PEOPLE))
+    tasks = TaskType.insert_many(task_rows(N_TASKS))
+    EmotionLog.insert_many(log_rows(n_events, people, tasks))
+    return n_events
+
+
+def fresh_database(workdir):
+    counter = iter(range(1_000_000))
+
+    def setup():
+        SQLConnect.configure(workdir / f"boxtime{next(counter)}.db")
+        migrate()
+
+    return setup
+
+
+def test_insert_people(benchmark, database, workdir):
+    rows = people_rows(N_PEOPLE)
+    benchmark.pedantic(
+        People.insert_many, args=(rows,), setup=fresh_database(workdir), rounds=5
+    )
+
+
+def test_insert_tasks(benchmark, database, workdir):
+    rows = task_rows(N_TASKS)
+    benchmark.pedantic(
+        TaskType.insert_many, args=(rows,), setup=fresh_database(workdir), rounds=5
+    )
+
+
+def test_insert_logs(benchmark, database, workdir, n_events):
+    setup = fresh_database(workdir)
+
+    def insert():
+        setup()
+        people = People.insert_many(people_rows(N_PEOPLE))
+        tasks = TaskType.insert_many(task_rows(N_TASKS))
+        return (log_rows(n_events, people, tasks),), {}
+
+    ids = benchmark.pedantic(EmotionLog.insert_many, setup=insert, rounds=3)
+    assert len(ids) == n_events
+
+
+def test_update_and_delete(benchmark, populated):
+    person = People.search(username="user0")[0]
+    task = TaskType.search(name="task0")[0]
+    log = EmotionLog.search(id=1)[0]
+
+    def write():
+        person.update(team="platform", role="lead")
+        task.update(skill=Skill.HARD, experience=0.5)
+        log.update(
+            feeling=Feeling.JOY,
+            timestamp=log.timestamp,
+            duration=30,
+            trigger="t",
+            reaction="r",
+            people_id=[person.id],
+            task_id=[task.id],
+        )
+        People.insert(username="temporary", team="t", role="r").delete()
+
+    benchmark(write)
+
+
+def test_search_people(benchmark, populated):
+    people = benchmark(People.search)
+    assert len(people) == N_PEOPLE
+    benchmark.extra_info["by_username"] = len(People.search(username="user1"))
+
+
+def test_search_tasks(benchmark, populated):
+    tasks = benchmark(TaskType.search)
+    assert len(tasks) == N_TASKS
+
+
+def test_search_logs(benchmark, populated):
+    logs = benchmark.pedantic(EmotionLog.search, rounds=3)
+    assert len(logs) == populated
+
+
+@pytest.mark.parametrize("days", [7, 90])
+def test_search_logs_by_time(benchmark, populated, days):
+    time_range = {"start": START, "end": START + timedelta(days=days)}
+    benchmark(EmotionLog.search, time_range=time_range)
+
+
+def test_search_logs_by_feeling(benchmark, populated):
+    logs = benchmark.pedantic(
+        EmotionLog.search, kwargs={"feeling": Feeling.JOY}, rounds=3
+    )
+    assert all(log.feeling == Feeling.JOY for log in logs)
+
+
+@pytest.mark.parametrize(
+    "period",
+    [AggregateBy.HOUR, AggregateBy.DAY_OF_WEEK, AggregateBy.WEEK, AggregateBy.MONTH],
+    ids=lambda period: period.value,
+)
+def test_log_stats(benchmark, populated, period):
+    aggregation = benchmark(EmotionLog.stats, AggregateBy.FEELING, period)
+    assert aggregation.counts.sum() == populated
+    person = People.search(username="user0")[0]
+    benchmark.extra_info["by_person"] = int(
+        EmotionLog.stats(
+            AggregateBy.FEELING, period, people_id=[person.id]
+        ).counts.sum()
+    )
+
+
+def test_snapshot(benchmark, populated, workdir):
+    path = workdir / "snapshot"
+    manifest = benchmark(export, path)
+    assert manifest["rows"]["emotion_log"] == populated
+    benchmark.extra_info["bytes"] = sum(f.stat().st_size for f in path.iterdir())
+
+    fresh_database(workdir)()
+    imported = import_(path)
+    assert imported["emotion_log"] == populated
+    assert len(Snapshot.open(path).log_intervals()) == populated
+    assert EmotionLog.stats(AggregateBy.FEELING).counts.sum() == populated
@@ -0,0 +1,109 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from boxtime.vendor.calendar import Event, EventService, Time
+from boxtime.vendor.frame import EventFrame
+from boxtime.vendor.sync import RawEvent
+from boxtime.vis.aggregate import AggregateBy, agg_by, agg_stream, group_by
+from boxtime.vis.overlap import LogIntervals, tag_feelings
+
+from tests.benchmarks.conftest import END, SEED, START, TAGS
+
+
+@pytest.fixture
+def events(raw_events: List[RawEvent]) -> List[Event]:
+    return EventService.load(raw_events, TAGS)
+
+
+@pytest.fixture
+def frame(raw_events: List[RawEvent]) -> EventFrame:
+    return EventFrame.from_items(raw_events, TAGS)
+
+
+def test_fetch(benchmark, calendar, workdir):
+    """
+    Paginated download of a range that isn't cached yet.
+    """
+
+    def uncached():
+        for path in workdir.glob("assets/events/*"):
+            path.unlink()
+
+    events = benchmark.pedantic(
+        EventService.list,
+        args=(START, END, TAGS),
+        kwargs={"as_frame": True},
+        setup=uncached,
+        rounds=3,
+    )
+    assert len(events) == len(calendar.events().items)
+
+
+@pytest.mark.parametrize("as_frame", [False, True], ids=["events", "frame"])
+def test_list_cached(benchmark, calendar, as_frame):
+    """
+    Reading a cached range, validating every `Event` or building an `EventFrame`.
+    """
+    EventService.list(START, END, TAGS)
+    events = benchmark.pedantic(
+        EventService.list,
+        args=(START, END, TAGS),
+        kwargs={"as_frame": as_frame},
+        rounds=3,
+    )
+    assert len(events) == len(calendar.events().items)
+
+
+def test_stream_aggregate(benchmark, calendar):
+    """
+    Tag totals over a cached range streamed in chunks.
+    """
+    EventService.list(START, END, TAGS)
+
+    def aggregate():
+        chunks = EventService.stream(START, END, TAGS, as_frame=True)
+        return agg_stream(chunks, AggregateBy.TAG)
+
+    aggregation = benchmark.pedantic(aggregate, rounds=3)
+    assert aggregation.counts.sum() == len(calendar.events().items)
+
+
+def test_parse_time(benchmark, raw_events):
+    def parse():
+        return [Time(**event["start"]).dt for event in raw_events]
+
+    times = benchmark.pedantic(parse, rounds=3)
+    assert len(times) == len(raw_events)
+
+
+@pytest.mark.parametrize(
+    "field", [AggregateBy.DAY, AggregateBy.WEEK, AggregateBy.TAG], ids=lambda f: f.value
+)
+def test_group_by(benchmark, events, field):
+    groups = benchmark(group_by, events, field)
+    assert sum(len(group) for group in groups.values()) == len(events)
+
+
+@pytest.mark.parametrize("source", ["events", "frame"])
+def test_agg_by(benchmark, request, n_events, source):
+    events = request.getfixturevalue(source)
+    aggregation = benchmark(agg_by, events, AggregateBy.TAG, AggregateBy.WEEK)
+    assert aggregation.counts.sum() == len(events)
+
+
+def test_overlap(benchmark, frame, n_events):
+    """
+    Tag and feeling co-occurrence of as many emotion logs as events.
+    """
+    rng = np.random.default_rng(SEED)
+    start = np.sort(rng.integers(START.timestamp(), END.timestamp(), n_events))
+    logs = LogIntervals(
+        id=np.arange(n_events),
+        start=start,
+        end=start + rng.integers(1, 120, n_events) * 60,
+        feeling=rng.integers(0, 5, n_events),
+    )
+    aggregation = benchmark.pedantic(tag_feelings, args=(frame, logs), rounds=3)
+    benchmark.extra_info["pairs"] = int(aggregation.counts.sum())
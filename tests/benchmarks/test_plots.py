@@ -0,0 +1,38 @@
+from typing import Callable, List
+
+import matplotlib.pyplot as plt
+import pytest
+
+from boxtime.vendor.frame import EventFrame
+from boxtime.vendor.sync import RawEvent
+from boxtime.vis.aggregate import AggregateBy
+from boxtime.vis.heatmap import plot_heatmap
+from boxtime.vis.radar import plot_radar
+from boxtime.vis.violin import plot_violin
+
+from tests.benchmarks.conftest import TAGS
+
+PLOTS = {
+    "heatmap": lambda frame: plot_heatmap(frame),
+    "radar": lambda frame: plot_radar(frame, TAGS),
+    "violin": lambda frame: plot_violin(frame, TAGS, AggregateBy.WEEK),
+}
+
+
+@pytest.fixture
+def frame(raw_events: List[RawEvent]) -> EventFrame:
+    return EventFrame.from_items(raw_events, TAGS)
+
+
+@pytest.mark.parametrize("plot", PLOTS.values(), ids=PLOTS.keys())
+def test_plot(benchmark, frame: EventFrame, plot: Callable):
+    """
+    Aggregating and drawing a chart, up to the rendered canvas.
+    """
+
+    def render():
+        fig = plot(frame)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    benchmark.pedantic(render, rounds=3)
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.migrations import migrate
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    Run in a temporary directory, caches under `assets/` are written there.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def database(workdir: Path):
+    """
+    A migrated database of its own for the test.
+    """
+    SQLConnect.configure(workdir / "boxtime.db")
+    migrate()
+    yield workdir / "boxtime.db"
+    SQLConnect.configure()
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from boxtime.vendor.frame import EventFrame
+from boxtime.vis.aggregate import AggregateBy, agg_by
+from boxtime.vis.batch import PlotKind, RenderJob, render_batch
+from boxtime.vis.colors import Color
+
+START = datetime(2023, 6, 5, 9, tzinfo=timezone.utc)
+TAGS = {Color(str(i)): f"tag{i}" for i in range(1, 4)}
+
+
+@pytest.fixture
+def frame() -> EventFrame:
+    items = [
+        {
+            "id": f"event{i}",
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.example.com/event{i}",
+            "created": "2023-05-01T09:00:00.000Z",
+            "updated": "2023-05-01T09:00:00.000Z",
+            "summary": f"Event {i}",
+            "start": {"dateTime": (START + timedelta(hours=9 * i)).isoformat()},
+            "end": {"dateTime": (START + timedelta(hours=9 * i + 2)).isoformat()},
+            "colorId": str(i % 3 + 1),
+        }
+        for i in range(30)
+    ]
+    return EventFrame.from_items(items, TAGS)
+
+
+def test_render_aggregations(frame):
+    # The heatmap job has no options.
+    jobs = [
+        RenderJob(PlotKind.HEATMAP, frame, "events"),
+        RenderJob(
+            PlotKind.RADAR, agg_by(frame, AggregateBy.TAG), "rollup", {"tags": TAGS}
+        ),
+    ]
+    paths = render_batch(jobs, max_workers=1)
+    assert paths == [
+        Path("assets", "events", "heatmap.png"),
+        Path("assets", "rollup", "radar.png"),
+    ]
+    assert all(path.is_file() for path in paths)
+
+
+def test_heatmap_needs_events(frame):
+    job = RenderJob(PlotKind.HEATMAP, agg_by(frame, AggregateBy.DAY), "rollup")
+    with pytest.raises(TypeError, match="Heatmaps"):
+        render_batch([job])
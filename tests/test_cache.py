@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.schema import People
+
+
+@pytest.fixture
+def loads(database, monkeypatch: pytest.MonkeyPatch) -> list:
+    People.insert_many(
+        {"username": f"user{i}", "team": "core", "role": "engineer"} for i in range(3)
+    )
+    People.cache.invalidate()
+    calls = []
+    load = People.cache.load
+
+    def counted():
+        calls.append(1)
+        return load()
+
+    monkeypatch.setattr(People.cache, "load", counted)
+    return calls
+
+
+def test_threads_keep_their_versions(loads):
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for _ in range(5):
+            assert len(People.search()) == 3
+            assert len(pool.submit(People.search).result()) == 3
+    assert len(loads) == 2
+
+
+def test_threads_keep_their_rows(database, monkeypatch: pytest.MonkeyPatch):
+    People.insert("early", "core", "engineer")
+    People.cache.invalidate()
+    read, resume = threading.Event(), threading.Event()
+    load = People.cache.load
+
+    def slow():
+        rows = load()
+        if threading.current_thread() is not threading.main_thread():
+            read.set()
+            resume.wait(5)
+        return rows
+
+    monkeypatch.setattr(People.cache, "load", slow)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # The worker reads the table, and keeps its rows until another connection has
+        # committed and this thread has read the table again.
+        stale = pool.submit(People.search)
+        assert read.wait(5)
+        conn = sqlite3.connect(database)
+        conn.execute(
+            "INSERT INTO people (username, team, role) VALUES ('late', 'core', 'sre')"
+        )
+        conn.commit()
+        conn.close()
+        assert People.search(username="late")
+        resume.set()
+        assert len(stale.result()) == 1
+
+    assert People.search(username="late")
+    assert len(People.search()) == 2
+
+
+def test_writes_are_noticed(loads, database):
+    People.search()
+    with SQLConnect() as cursor:
+        cursor.execute(
+            "INSERT INTO people (username, team, role) VALUES ('raw', 'core', 'sre')"
+        )
+    assert People.search(username="raw")[0].role == "sre"
+
+    People.search(username="user0")[0].update("infra", "lead")
+    assert People.search(username="user0")[0].team == "infra"
+
+    # Another process, or any connection the manager doesn't own.
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM people WHERE username = 'user1'")
+    conn.commit()
+    conn.close()
+    assert People.search(username="user1") == []
+    assert len(loads) == 4
+
+
+def test_transactions(loads):
+    People.search()
+    with SQLConnect.transaction():
+        for _ in range(3):
+            assert len(People.search()) == 3
+        assert len(loads) == 1
+
+        People.insert("pending", "core", "engineer")
+        assert People.search(username="pending")
+        assert People.search(username="pending")
+        assert len(loads) == 3
+    assert People.search(username="pending")
+
+    with pytest.raises(ValueError):
+        with SQLConnect.transaction():
+            People.insert("rolled back", "core", "engineer")
+            assert People.search(username="rolled back")
+            raise ValueError
+    assert People.search(username="rolled back") == []
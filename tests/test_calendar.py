@@ -0,0 +1,288 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import httplib2
+import numpy as np
+import pytest
+from googleapiclient.errors import HttpError
+
+from boxtime.db.aggregation import AggregateBy
+from boxtime.db.rollup import EventRollup
+from boxtime.vendor.calendar import EventService, Time
+from boxtime.vendor.frame import EventFrame
+from boxtime.vendor.sync import RawEvent
+from boxtime.vis.aggregate import agg_by
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def raw_event(i: int, start: datetime, hours: float = 1, **fields: Any) -> RawEvent:
+    end = start + timedelta(hours=hours)
+    return {
+        "id": f"event{i}",
+        "status": "confirmed",
+        "htmlLink": f"https://calendar.example.com/event{i}",
+        "created": "2022-12-01T09:00:00.000Z",
+        "updated": "2022-12-01T09:00:00.000Z",
+        "summary": f"Event {i}",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": end.isoformat()},
+        **fields,
+    }
+
+
+class FakeRequest:
+    def __init__(self, response: Dict[str, Any] | Exception):
+        self.response = response
+
+    def execute(self) -> Dict[str, Any]:
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class FakeCalendar:
+    """
+    `events()` of the calendar API over a calendar that changes between requests.
+
+    Lists are filtered by `timeMin`/`timeMax` and paginated. Every change is appended to a
+    log, a sync token is the length of the log when it was handed out.
+    """
+
+    def __init__(self, items: List[RawEvent], page_size: int = 2):
+        self.items = {item["id"]: item for item in items}
+        self.changes: List[RawEvent] = []
+        self.page_size = page_size
+        self.expired = False
+        self.requests: List[Dict[str, Any]] = []
+
+    def put(self, item: RawEvent) -> None:
+        self.items[item["id"]] = item
+        self.changes.append(item)
+
+    def cancel(self, id_: str) -> None:
+        del self.items[id_]
+        self.changes.append({"id": id_, "status": "cancelled"})
+
+    def events(self) -> "FakeCalendar":
+        return self
+
+    def list(
+        self,
+        pageToken: str | None = None,
+        syncToken: str | None = None,
+        timeMin: str | None = None,
+        timeMax: str | None = None,
+        **params: Any,
+    ) -> FakeRequest:
+        self.requests.append(
+            {"pageToken": pageToken, "syncToken": syncToken, "timeMin": timeMin}
+        )
+        if syncToken is not None:
+            if self.expired:
+                return FakeRequest(HttpError(httplib2.Response({"status": 410}), b""))
+            latest = {item["id"]: item for item in self.changes[int(syncToken) :]}
+            items = list(latest.values())
+        else:
+            items = list(self.items.values())
+        if timeMin is not None:
+            lo = datetime.fromisoformat(timeMin).timestamp()
+            hi = datetime.fromisoformat(timeMax).timestamp()
+            items = [
+                item
+                for item in items
+                if Time(**item["start"]).epoch < hi and Time(**item["end"]).epoch > lo
+            ]
+
+        offset = int(pageToken or 0)
+        page: Dict[str, Any] = {"items": items[offset : offset + self.page_size]}
+        if offset + self.page_size < len(items):
+            page["nextPageToken"] = str(offset + self.page_size)
+        else:
+            page["nextSyncToken"] = str(len(self.changes))
+        return FakeRequest(page)
+
+
+def serve(monkeypatch: pytest.MonkeyPatch, calendar: FakeCalendar) -> None:
+    """
+    Serve `calendar` in place of the calendar API, without credentials.
+    """
+    monkeypatch.setattr(EventService, "client", calendar)
+    monkeypatch.setattr(EventService, "credentials", None)
+    monkeypatch.setattr(EventService, "credentials_factory", staticmethod(object))
+    monkeypatch.setattr(
+        EventService, "client_factory", staticmethod(lambda credentials: calendar)
+    )
+
+
+@pytest.fixture
+def fake(monkeypatch: pytest.MonkeyPatch) -> FakeCalendar:
+    items = [raw_event(i, START + timedelta(days=i, hours=9)) for i in range(5)]
+    calendar = FakeCalendar(items)
+    serve(monkeypatch, calendar)
+    return calendar
+
+
+def rolled_up_hours() -> float:
+    return float(EventRollup.daily_hours()[1].sum())
+
+
+def test_incremental_sync(database, fake):
+    cache = EventService.sync()
+    assert set(cache.items) == set(fake.items)
+    assert cache.sync_token == "0"
+    assert rolled_up_hours() == 5
+
+    fake.put(raw_event(1, START + timedelta(days=10), hours=3, summary="Moved"))
+    fake.cancel("event2")
+    fake.put(raw_event(9, START + timedelta(days=20)))
+    requests = len(fake.requests)
+    cache = EventService.sync()
+
+    synced = fake.requests[requests:]
+    assert {request["syncToken"] for request in synced} == {"0"}
+    assert len(synced) == 2
+    assert cache.items == fake.items
+    assert cache.items["event1"]["summary"] == "Moved"
+    assert cache.sync_token == "3"
+    assert rolled_up_hours() == 1 + 3 + 1 + 1 + 1
+
+    # The cache survives on disk and serves ranges.
+    events = EventService.list(START, START + timedelta(days=15), {}, sync=True)
+    assert sorted(event.id for event in events) == [
+        "event0",
+        "event1",
+        "event3",
+        "event4",
+    ]
+
+
+def test_expired_sync_token(database, fake):
+    EventService.sync()
+    fake.expired = True
+    fake.cancel("event0")
+    fake.put(raw_event(7, START + timedelta(days=30)))
+    requests = len(fake.requests)
+
+    cache = EventService.sync()
+
+    retried = fake.requests[requests:]
+    assert retried[0]["syncToken"] == "0"
+    assert all(request["syncToken"] is None for request in retried[1:])
+    assert cache.items == fake.items
+    assert rolled_up_hours() == len(fake.items)
+
+
+def test_sync_without_changes(database, fake):
+    EventService.sync()
+    with open("assets/events/primary_True.sync.json") as f:
+        saved = json.load(f)
+    cache = EventService.sync()
+    assert cache.items == saved["items"]
+    assert cache.sync_token == saved["sync_token"]
+
+
+def test_rollup_aggregate(database, fake):
+    fake.put(raw_event(5, START + timedelta(days=8), hours=2, colorId="3"))
+    EventService.sync()
+    fields = (AggregateBy.DAY_OF_WEEK, AggregateBy.TAG)
+    expected = agg_by(EventFrame.from_items(list(fake.items.values()), {}), *fields)
+    rolled = EventRollup.aggregate({}, *fields)
+    assert np.array_equal(rolled.counts, expected.counts)
+    assert np.allclose(rolled.values, expected.values)
+
+    with pytest.raises(ValueError):
+        EventRollup.aggregate({})
+    with pytest.raises(ValueError):
+        EventRollup.aggregate({}, AggregateBy.HOUR)
+
+
+@pytest.fixture
+def months(monkeypatch: pytest.MonkeyPatch) -> FakeCalendar:
+    """
+    Three months of events, a few of them crossing a month boundary.
+    """
+    items = [raw_event(i, START + timedelta(days=2 * i, hours=10)) for i in range(45)]
+    items += [
+        raw_event(100, datetime(2023, 1, 31, 22, tzinfo=timezone.utc), hours=4),
+        raw_event(101, datetime(2023, 2, 28, 12, tzinfo=timezone.utc), hours=48),
+        raw_event(102, datetime(2023, 1, 30, tzinfo=timezone.utc), hours=24 * 40),
+    ]
+    calendar = FakeCalendar(items, page_size=4)
+    serve(monkeypatch, calendar)
+    return calendar
+
+
+def test_fetch_windows(months):
+    end = datetime(2023, 4, 1, tzinfo=timezone.utc)
+    serial = EventService.fetch(START, end, calendarId="primary")
+    requests = len(months.requests)
+    parallel = EventService.fetch(START, end, max_workers=3, calendarId="primary")
+
+    windows = {request["timeMin"] for request in months.requests[requests:]}
+    assert len(windows) == 3
+    assert any(request["pageToken"] for request in months.requests[requests:])
+    ids = [item["id"] for item in parallel]
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(item["id"] for item in serial)
+    assert sorted(ids) == sorted(months.items)
+
+
+def test_fetch_authorizes_once(months, monkeypatch: pytest.MonkeyPatch):
+    credentials = object()
+    authorized, built = [], []
+
+    def authorize():
+        authorized.append(threading.current_thread())
+        return credentials
+
+    def client(given):
+        built.append(given)
+        return months
+
+    monkeypatch.setattr(EventService, "credentials_factory", staticmethod(authorize))
+    monkeypatch.setattr(EventService, "client_factory", staticmethod(client))
+    EventService.fetch(START, datetime(2023, 4, 1, tzinfo=timezone.utc), max_workers=3)
+    assert authorized == [threading.main_thread()]
+    assert built and all(given is credentials for given in built)
+
+
+def test_list_windows_cached(months):
+    end = datetime(2023, 4, 1, tzinfo=timezone.utc)
+    frame = EventService.list(START, end, {}, as_frame=True, max_workers=3)
+    assert sorted(frame.id.tolist()) == sorted(months.items)
+
+    requests = len(months.requests)
+    events = EventService.list(START, end, {}, max_workers=3)
+    assert len(months.requests) == requests
+    assert sorted(event.id for event in events) == sorted(months.items)
+
+
+@pytest.fixture
+def local_time_zone(monkeypatch: pytest.MonkeyPatch):
+    """
+    A local time zone ahead of UTC, where naive datetimes read as local time differ.
+    """
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_frame_between_naive_bounds(months, local_time_zone):
+    lo, hi = datetime(2023, 2, 1), datetime(2023, 3, 1)
+    frame = EventService.list(START, datetime(2023, 4, 1), {}, as_frame=True)
+    utc = frame.between(
+        lo.replace(tzinfo=timezone.utc), hi.replace(tzinfo=timezone.utc)
+    )
+
+    naive = frame.between(lo, hi)
+    assert naive.id.tolist() == utc.id.tolist()
+    # Starts at 22:00 UTC on Jan 31, in the window if the bounds were Kolkata time.
+    assert "event100" not in naive.id.tolist()
+    listed = EventService.list(lo, hi, {})
+    assert {event.id for event in listed} >= set(naive.id.tolist())
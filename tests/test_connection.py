@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+
+
+@pytest.fixture
+def deferred(database):
+    with SQLConnect() as cursor:
+        cursor.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        cursor.execute(
+            "CREATE TABLE child (parent_id INTEGER REFERENCES parent (id)"
+            " DEFERRABLE INITIALLY DEFERRED)"
+        )
+
+
+def test_failed_commit_rolls_back(deferred):
+    # The foreign key is only checked on commit, which fails.
+    with pytest.raises(sqlite3.IntegrityError):
+        with SQLConnect() as cursor:
+            cursor.execute("INSERT INTO child (parent_id) VALUES (1)")
+
+    assert SQLConnect.manager.depth == 0
+    assert not SQLConnect.manager.connection.in_transaction
+    with SQLConnect() as cursor:
+        cursor.execute("INSERT INTO parent (id) VALUES (1)")
+        cursor.execute("INSERT INTO child (parent_id) VALUES (1)")
+    with SQLConnect(readonly=True) as cursor:
+        assert cursor.execute("SELECT COUNT(*) FROM child").fetchone()[0] == 1
+
+
+def test_nested_blocks_commit_once(database):
+    with SQLConnect.transaction() as outer:
+        outer.execute("CREATE TABLE t (x INTEGER)")
+        with pytest.raises(ValueError):
+            with SQLConnect() as inner:
+                inner.execute("INSERT INTO t VALUES (1)")
+                assert SQLConnect.manager.depth == 2
+                raise ValueError
+        assert SQLConnect.manager.depth == 1
+        assert SQLConnect.manager.connection.in_transaction
+    assert SQLConnect.manager.depth == 0
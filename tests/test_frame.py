@@ -0,0 +1,29 @@
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+
+from boxtime.vendor.frame import day_of_week, day_of_week_sql, iso_week, iso_week_sql
+
+EPOCH = date(1970, 1, 1)
+
+
+def test_weeks_match_isocalendar():
+    # Every day around several new years, including years with 53 ISO weeks.
+    dates = [date(2019, 12, 1) + timedelta(days=i) for i in range(6 * 366)]
+    days = np.array([(d - EPOCH).days for d in dates])
+    weekdays = [d.isoweekday() - 1 for d in dates]
+    weeks = [d.isocalendar().week - 1 for d in dates]
+
+    assert day_of_week(days).tolist() == weekdays
+    assert day_of_week(days.astype("datetime64[D]")).tolist() == weekdays
+    assert iso_week(days).tolist() == weeks
+
+    conn = sqlite3.connect(":memory:")
+    rows = conn.execute(
+        f"SELECT {day_of_week_sql('value')}, {iso_week_sql('value')}"
+        " FROM json_each(?) ORDER BY key",
+        (str(days.tolist()),),
+    ).fetchall()
+    conn.close()
+    assert rows == list(zip(weekdays, weeks))
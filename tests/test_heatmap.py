@@ -0,0 +1,16 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+matplotlib.use("Agg")
+
+from boxtime.vis.heatmap import plot_daily_heatmap  # noqa: E402
+
+
+def test_every_day_over_the_cap():
+    start = np.datetime64("2022-01-01").astype(np.int64)
+    days = np.arange(start, start + 365)
+    fig = plot_daily_heatmap(days, np.full(len(days), 20.0))
+    fig.canvas.draw()
+    assert [mesh.get_clim() for mesh in fig.axes[0].collections] == [(0, 15)]
+    plt.close(fig)
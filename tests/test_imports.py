@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Loaded on first use only, by the calendar client and the plotters.
+HEAVY = ("google", "googleapiclient", "google_auth_oauthlib", "matplotlib", "seaborn")
+# Seconds `python -X importtime` may report for a cold import, measured around 0.4s for
+# `boxtime.vis.aggregate`, most of it numpy, pydantic and loguru. Generous, so a slow machine
+# passes while an eager plotting or google import (another 0.4s or more) plus OAuth or a
+# discovery fetch does not.
+IMPORT_BUDGET = 1.0
+
+
+def loaded_modules(*modules: str) -> list:
+    imports = ", ".join(("sys",) + modules)
+    return subprocess.run(
+        [sys.executable, "-c", f"import {imports}; print('\\n'.join(sys.modules))"],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+
+def import_seconds(module: str) -> float:
+    """
+    Cumulative import time of `module` in a fresh interpreter, the best of three runs.
+    """
+    times = []
+    for _ in range(3):
+        report = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=Path(__file__).parents[1],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        for line in report.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                times.append(int(fields[1]) / 1e6)
+    return min(times)
+
+
+@pytest.mark.parametrize(
+    "module", ["boxtime.vis", "boxtime.vis.aggregate", "boxtime.vendor.calendar"]
+)
+def test_cold_import(module):
+    heavy = [name for name in loaded_modules(module) if name.split(".")[0] in HEAVY]
+    assert heavy == []
+
+
+@pytest.mark.parametrize("module", ["boxtime.vis.aggregate", "boxtime.cli"])
+def test_import_budget(module):
+    assert import_seconds(module) < IMPORT_BUDGET
@@ -0,0 +1,128 @@
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.migrations import MIGRATIONS, migrate, schema_version
+from boxtime.db.schema import EmotionLog, Feeling, People, TaskType
+
+# Tables as created before the schema was versioned, links kept as `str(list)`.
+LEGACY_SCHEMA = """
+CREATE TABLE people (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    team TEXT NOT NULL,
+    role TEXT NOT NULL,
+    is_self INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE task_type (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    skill INTEGER NOT NULL,
+    experience REAL NOT NULL
+);
+CREATE TABLE emotion_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    feeling INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    trigger TEXT NOT NULL,
+    reaction TEXT NOT NULL,
+    people_id TEXT,
+    task_id TEXT,
+    resolved INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@pytest.fixture
+def legacy(workdir: Path):
+    path = workdir / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO people (username, team, role) VALUES (?, ?, ?)",
+        [("ana", "core", "engineer"), ("bo", "core", "manager")],
+    )
+    conn.execute(
+        "INSERT INTO task_type (name, skill, experience) VALUES ('review', 1, 0.5)"
+    )
+    conn.executemany(
+        "INSERT INTO emotion_log (feeling, timestamp, duration, trigger, reaction,"
+        " people_id, task_id, resolved) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                0,
+                "2023-01-05 10:00:00+00:00",
+                30,
+                "deadlines moved",
+                "sighed",
+                "[1, 2]",
+                "[1]",
+                0,
+            ),
+            (
+                3,
+                "2023-01-06T16:30:00+05:30",
+                15,
+                "pairing went well",
+                "smiled",
+                "[2, 99]",
+                "[]",
+                1,
+            ),
+            (2, "2023-01-07 08:00:00+00:00", 45, "outage", "paged", None, None, 0),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    SQLConnect.configure(path)
+    yield path
+    SQLConnect.configure()
+
+
+def test_legacy_database(legacy):
+    assert schema_version() == 0
+    assert migrate() == len(MIGRATIONS)
+    assert schema_version() == len(MIGRATIONS)
+
+    first, second, third = EmotionLog.search()
+    assert [person.username for person in first.people] == ["ana", "bo"]
+    assert [task.name for task in first.task] == ["review"]
+    assert first.timestamp == datetime(2023, 1, 5, 10, tzinfo=timezone.utc)
+    assert first.feeling == Feeling(0)
+    # Links to people that don't exist are dropped.
+    assert [person.username for person in second.people] == ["bo"]
+    assert second.task == []
+    assert second.timestamp == datetime(2023, 1, 6, 11, tzinfo=timezone.utc)
+    assert second.resolved
+    assert third.people == [] and third.task == []
+
+    with SQLConnect(readonly=True) as cursor:
+        columns = [
+            row["name"] for row in cursor.execute("PRAGMA table_info(emotion_log)")
+        ]
+        assert "people_id" not in columns
+        assert cursor.execute("PRAGMA foreign_key_check").fetchall() == []
+        assert cursor.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+    # Logs from before the full-text index are indexed by the migration.
+    assert [match.log.id for match in EmotionLog.search_text("deadline")] == [1]
+
+    # New rows link to the migrated ones.
+    log = EmotionLog.insert(
+        Feeling(1), datetime(2023, 2, 1, tzinfo=timezone.utc), 10, "x", "y", [1], [1]
+    )
+    assert log.id == 4
+    assert [person.id for person in log.people] == [1]
+
+
+def test_migrate_is_idempotent(legacy):
+    migrate()
+    logs = EmotionLog.search()
+    assert migrate() == len(MIGRATIONS)
+    assert EmotionLog.search() == logs
+    assert len(People.search()) == 2
+    assert len(TaskType.search()) == 1
@@ -0,0 +1,18 @@
+from boxtime.db.schema import People, Skill, TaskType
+
+
+def test_people_update(database):
+    person = People.insert("ana", "core", "engineer")
+    other = People.insert("bo", "core", "engineer")
+    person.update("platform", "manager")
+    assert (person.team, person.role) == ("platform", "manager")
+    assert People.search(id=person.id) == [person]
+    assert People.search(id=other.id)[0].team == "core"
+
+
+def test_task_type_skill(database):
+    task = TaskType.insert("review", Skill.HARD, 0.5)
+    assert TaskType.search(name="review") == [task]
+    task.update(Skill.SOFT, 0.75)
+    assert (task.skill, task.experience) == (Skill.SOFT, 0.75)
+    assert TaskType.search(id=task.id)[0].skill == Skill.SOFT
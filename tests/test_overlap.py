@@ -0,0 +1,119 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from boxtime.vendor.frame import EventFrame
+from boxtime.vis.overlap import (
+    LogIntervals,
+    attendee_feelings,
+    overlapping,
+    tag_feelings,
+)
+
+SEED = 11
+START = datetime(2023, 5, 1, tzinfo=timezone.utc)
+
+
+def brute_force(a_start, a_end, b_start, b_end):
+    return sorted(
+        (i, j)
+        for i in range(len(a_start))
+        for j in range(len(b_start))
+        if max(a_start[i], b_start[j]) < min(a_end[i], b_end[j])
+    )
+
+
+@pytest.mark.parametrize("trial", range(50))
+def test_overlapping(trial):
+    rng = np.random.default_rng(trial)
+    n, m = rng.integers(0, 30, 2)
+    # Few distinct times, so many intervals share or touch endpoints, some are empty.
+    a_start = rng.integers(0, 40, n)
+    a_end = a_start + rng.integers(0, 8, n)
+    b_start = rng.integers(0, 40, m)
+    b_end = b_start + rng.integers(0, 8, m)
+
+    i, j = overlapping(a_start, a_end, b_start, b_end)
+    assert sorted(zip(i.tolist(), j.tolist())) == brute_force(
+        a_start, a_end, b_start, b_end
+    )
+
+
+def raw_event(i: int, start: datetime, minutes: int, color: int, attendees):
+    event = {
+        "id": f"event{i}",
+        "status": "confirmed",
+        "htmlLink": f"https://calendar.example.com/event{i}",
+        "created": "2023-04-01T09:00:00.000Z",
+        "updated": "2023-04-01T09:00:00.000Z",
+        "summary": f"Event {i}",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(minutes=minutes)).isoformat()},
+        "attendees": [{"email": email} for email in attendees]
+        + [{"email": "me@example.com", "self": True}],
+    }
+    if color:
+        event["colorId"] = str(color)
+    return event
+
+
+@pytest.fixture
+def calendar():
+    rng = np.random.default_rng(SEED)
+    people = [f"p{i}@example.com" for i in range(6)]
+    items = [
+        raw_event(
+            i,
+            START + timedelta(minutes=15 * int(rng.integers(0, 400))),
+            15 * int(rng.integers(1, 8)),
+            int(rng.integers(0, 12)),
+            list(rng.choice(people, int(rng.integers(0, 3)), replace=False)),
+        )
+        for i in range(80)
+    ]
+    frame = EventFrame.from_items(items, {})
+    start = frame.start.min() + np.sort(rng.integers(0, 4 * 24 * 3600, 60))
+    logs = LogIntervals(
+        id=np.arange(60),
+        start=start,
+        end=start + rng.integers(0, 120, 60) * 60,
+        feeling=rng.integers(0, 5, 60),
+    )
+    return items, frame, logs
+
+
+def test_tag_and_attendee_feelings(calendar):
+    items, frame, logs = calendar
+    tags = defaultdict(float)
+    attendees = defaultdict(float)
+    pairs = 0
+    for e in range(len(frame)):
+        for j in range(len(logs)):
+            seconds = min(frame.end[e], logs.end[j]) - max(
+                frame.start[e], logs.start[j]
+            )
+            if seconds <= 0:
+                continue
+            pairs += 1
+            feeling = int(logs.feeling[j])
+            tags[int(frame.color[e]), feeling] += seconds / 3600
+            for user in items[frame.row[e]]["attendees"]:
+                if not user.get("self"):
+                    attendees[user["email"], feeling] += seconds / 3600
+
+    by_tag = tag_feelings(frame, logs)
+    assert by_tag.counts.sum() == pairs
+    expected = np.zeros_like(by_tag.values)
+    for (color, feeling), hours in tags.items():
+        expected[color, feeling] = hours
+    assert np.allclose(by_tag.values, expected)
+
+    by_attendee = attendee_feelings(frame, logs)
+    labels = list(by_attendee.labels[0])
+    assert "me@example.com" not in labels
+    assert len(labels) == len({email for email, _ in attendees})
+    for (email, feeling), hours in attendees.items():
+        assert by_attendee.values[labels.index(email), feeling] == pytest.approx(hours)
+    assert by_attendee.values.sum() == pytest.approx(sum(attendees.values()))
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from typing import List
+
+from textual.app import App, ComposeResult
+from textual.widgets import LoadingIndicator
+
+from boxtime.cli.widgets.paged_table import PagedTable, Row
+
+
+class Pages:
+    """
+    Rows `0..total` a page at a time, held until `release` and failing when asked to.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.fail = False
+        self.gate = threading.Event()
+
+    def __call__(self, after: int | None, limit: int) -> List[Row]:
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("database is locked")
+        start = 0 if after is None else after + 1
+        return [
+            (key, (str(key),)) for key in range(start, min(start + limit, self.total))
+        ]
+
+
+class TableApp(App):
+    def __init__(self, pages: Pages):
+        super().__init__()
+        self.pages = pages
+
+    def compose(self) -> ComposeResult:
+        yield PagedTable(self.pages, ["key"], page_size=10)
+
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("timed out")
+
+
+def test_fetching_keeps_table_usable():
+    async def run() -> None:
+        pages = Pages(total=15)
+        pages.fail = True
+        app = TableApp(pages)
+        async with app.run_test():
+            table = app.query_one(PagedTable)
+            await wait_for(lambda: table._fetching)
+            # A page in flight doesn't cover the table.
+            assert not app.query(LoadingIndicator)
+            assert table.focusable
+
+            pages.gate.set()
+            await wait_for(lambda: not table._fetching)
+            assert table.row_count == 0
+
+            # The failed page is asked for again.
+            pages.fail = False
+            table.load_more()
+            await wait_for(lambda: table.exhausted)
+            assert table.row_count == 15
+
+    asyncio.run(run())
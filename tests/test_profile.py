@@ -0,0 +1,6 @@
+from boxtime.cli import main
+
+
+def test_report_without_log(workdir, capsys):
+    main(["profile", "--log", "missing.log"])
+    assert capsys.readouterr().out.startswith("No profiling records in missing.log")
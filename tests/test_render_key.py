@@ -0,0 +1,15 @@
+import matplotlib
+import numpy as np
+import pytest
+import seaborn
+
+from boxtime.vis.utils import render_key
+
+
+@pytest.mark.parametrize("module", [matplotlib, seaborn], ids=["matplotlib", "seaborn"])
+def test_renderer_versions(module, monkeypatch: pytest.MonkeyPatch):
+    data = np.arange(7.0)
+    key = render_key("heatmap", data, vmax=15)
+    assert render_key("heatmap", data, vmax=15) == key
+    monkeypatch.setattr(module, "__version__", "0.0.0")
+    assert render_key("heatmap", data, vmax=15) != key
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from boxtime.db.connection import SQLConnect
+from boxtime.db.schema import EmotionLog, Feeling
+
+START = datetime(2023, 3, 1, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def logs(database):
+    texts = [
+        ("the deadline moved again", "took a walk"),
+        ("standup ran long", "skipped lunch"),
+        ("Café meeting about deadlines", "wrote notes"),
+    ]
+    EmotionLog.insert_many(
+        {
+            "feeling": Feeling(i % 5),
+            "timestamp": START + timedelta(hours=i),
+            "duration": 30,
+            "trigger": trigger,
+            "reaction": reaction,
+            "people_id": [],
+            "task_id": [],
+        }
+        for i, (trigger, reaction) in enumerate(texts)
+    )
+    return EmotionLog.search()
+
+
+def found(text: str) -> list:
+    return sorted(match.log.id for match in EmotionLog.search_text(text))
+
+
+def integrity_check() -> None:
+    with SQLConnect(readonly=True) as cursor:
+        cursor.execute(
+            "INSERT INTO emotion_log_fts (emotion_log_fts) VALUES ('integrity-check')"
+        )
+
+
+def test_search_matches(logs):
+    assert found("deadline") == [logs[0].id, logs[2].id]
+    assert found("cafe") == [logs[2].id]
+    assert found("lun") == [logs[1].id]
+    match = EmotionLog.search_text("walk")[0]
+    assert match.snippet == "took a [walk]"
+
+
+def test_index_follows_updates(logs):
+    log = logs[1]
+    log.update(
+        log.feeling,
+        log.timestamp,
+        log.duration,
+        "retro overran",
+        "skipped lunch",
+        [],
+        [],
+    )
+    assert found("standup") == []
+    assert found("retro") == [log.id]
+    assert found("lunch") == [log.id]
+    integrity_check()
+
+
+def test_index_follows_deletes(logs):
+    logs[0].delete()
+    assert found("deadline") == [logs[2].id]
+    assert found("walk") == []
+    integrity_check()
+
+
+def test_index_follows_upserts(logs):
+    log = logs[2].model_copy(update={"trigger": "quiet focus time"})
+    EmotionLog.upsert_many([log])
+    assert found("deadline") == [logs[0].id]
+    assert found("focus") == [log.id]
+    integrity_check()
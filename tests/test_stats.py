@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from boxtime.db.aggregation import AggregateBy
+from boxtime.db.schema import EmotionLog, Feeling
+
+START = datetime(2023, 3, 6, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def logs(database):
+    EmotionLog.insert_many(
+        {
+            "feeling": Feeling(i % 5),
+            "timestamp": START + timedelta(hours=7 * i),
+            "duration": 15 * (i % 4 + 1),
+            "trigger": f"trigger {i}",
+            "reaction": "reaction",
+            "people_id": [],
+            "task_id": [],
+        }
+        for i in range(40)
+    )
+    return EmotionLog.search()
+
+
+def test_stats_by_feeling(logs):
+    stats = EmotionLog.stats(AggregateBy.FEELING)
+    for feeling in Feeling:
+        matching = [log for log in logs if log.feeling == feeling]
+        assert stats.counts[feeling.value] == len(matching)
+        assert stats.values[feeling.value] == pytest.approx(
+            sum(log.duration for log in matching) / 60
+        )
+    assert stats.labels[0].tolist() == [feeling.name.lower() for feeling in Feeling]
+
+
+def test_stats_by_period(logs):
+    stats = EmotionLog.stats(AggregateBy.DAY_OF_WEEK, AggregateBy.WEEK)
+    expected = Counter(
+        (local.isoweekday() - 1, local.isocalendar().week - 1)
+        for local in (log.timestamp.astimezone() for log in logs)
+    )
+    assert stats.counts.sum() == len(logs)
+    for (weekday, week), count in expected.items():
+        assert stats.counts[weekday, week] == count
+
+
+def test_stats_needs_fields(logs):
+    with pytest.raises(ValueError):
+        EmotionLog.stats()
+    with pytest.raises(ValueError):
+        EmotionLog.stats(AggregateBy.TAG)
+
+
+def test_schema_does_not_import_vis():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, boxtime.db.schema, boxtime.db.rollup;"
+            " print('\\n'.join(sys.modules))",
+        ],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    assert [name for name in loaded if name.startswith("boxtime.vis")] == []